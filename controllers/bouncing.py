@@ -1,12 +1,11 @@
 import numpy as np
-from typing import List
+from typing import List, Dict
 import random
 from pathlib import Path
-from tdw.controller import Controller
 from tdw.librarian import ModelLibrarian
 from tdw.tdw_utils import TDWUtils
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs
 
 
 class Bouncing(RigidbodiesDataset):
@@ -16,13 +15,13 @@ class Bouncing(RigidbodiesDataset):
                      {"x": 4.95, "y": 2.0, "z": -1.65},
                      {"x": 1.95, "y": 2.0, "z": -3.25},
                      {"x": -4.2, "y": 1.0, "z": -3}]
-    Controller.MODEL_LIBRARIANS["models_full.json"] = ModelLibrarian("models_full.json")
-    RAMPS = [Controller.MODEL_LIBRARIANS["models_full.json"].get_record("ramp_with_platform_30"),
-             Controller.MODEL_LIBRARIANS["models_full.json"].get_record("ramp_with_platform_60")]
     RAMP_MASS = 500
 
-    def __init__(self, port: int = 1071):
+    def __init__(self, port: int = 1071, **kwargs):
         self.toy_records = ModelLibrarian(str(Path("toys.json").resolve())).records
+        # The unit scale of each record never changes, so only calculate it once.
+        self._unit_scales: Dict[str, float] = {record.name: TDWUtils.get_unit_scale(record)
+                                               for record in self.toy_records}
         self.ramp_positions = [{"x": 3.5, "y": 0.02, "z": 1.5},
                                {"x": -1, "y": 0.02, "z": 2.38},
                                {"x": 4.58, "y": 0.02, "z": -2.85},
@@ -35,7 +34,7 @@ class Bouncing(RigidbodiesDataset):
                                {"x": -90, "y": -120, "z": 0},
                                {"x": 0, "y": 120, "z": 0}]
 
-        super().__init__(port=port)
+        super().__init__(port=port, **kwargs)
 
     def get_field_of_view(self) -> float:
         return 65
@@ -94,7 +93,7 @@ class Bouncing(RigidbodiesDataset):
             pos[1] = random.uniform(0.7, 2)
             record = self.toy_records[i]
             # Add a toy-sized object.
-            s = TDWUtils.get_unit_scale(record) * random.uniform(0.85, 1.12)
+            s = self._unit_scales[record.name] * random.uniform(0.85, 1.12)
             commands.extend(self.get_add_physics_object(model_name=record.name,
                                                         library="models_full.json",
                                                         object_id=toy_id,
@@ -135,4 +134,5 @@ class Bouncing(RigidbodiesDataset):
 
 if __name__ == "__main__":
     args = get_args("bouncing")
-    Bouncing().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Bouncing(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
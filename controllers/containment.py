@@ -1,11 +1,10 @@
-from typing import List
+from typing import List, Deque
+from collections import deque
 from random import choice, uniform
 from tdw.tdw_utils import TDWUtils
-from tdw.controller import Controller
-from tdw.librarian import ModelLibrarian
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset
 from tdw_physics.physics_info import PHYSICS_INFO
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs, get_model_librarian
 
 
 class Containment(RigidbodiesDataset):
@@ -14,7 +13,6 @@ class Containment(RigidbodiesDataset):
     object and is shaken violently, causing the target object to move around and possibly fall out.
     """
 
-    Controller.MODEL_LIBRARIANS["models_full.json"] = ModelLibrarian("models_full.json")
     CONTAINERS = ["woodbowl_a02",
                   "blue_basket",
                   "bucketnew",
@@ -63,16 +61,16 @@ class Containment(RigidbodiesDataset):
     O_X = -1.3
     O_Z = -2.15
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
 
-        for key in PHYSICS_INFO:
-            # All containers have the same physics values. Set these manually.
-            if key in Containment.CONTAINERS:
-                PHYSICS_INFO[key].mass = 3
+        # All containers have the same physics values. Set these manually.
+        for container_name in Containment.CONTAINERS:
+            if container_name in PHYSICS_INFO:
+                PHYSICS_INFO[container_name].mass = 3
 
         # Commands to shake the container per frame.
-        self._shake_commands: List[List[dict]] = []
+        self._shake_commands: Deque[List[dict]] = deque()
         self._max_num_frames: int = 0
 
     def get_field_of_view(self) -> float:
@@ -117,7 +115,7 @@ class Containment(RigidbodiesDataset):
         # Add a random target object, with random size, mass, bounciness and initial orientation.
         object_name = choice(Containment.OBJECTS)
         o_id = self.get_unique_id()
-        o_record = Controller.MODEL_LIBRARIANS["models_full.json"].get_record(object_name)
+        o_record = get_model_librarian("models_full.json").get_record(object_name)
         o_scale = TDWUtils.get_unit_scale(o_record) * uniform(0.2, 0.3)
         commands.extend(self.get_add_physics_object(model_name=o_record.name,
                                                     library="models_full.json",
@@ -138,13 +136,15 @@ class Containment(RigidbodiesDataset):
         # Let the objects settle.
         commands.append({"$type": "step_physics",
                          "frames": 50})
-        del self._shake_commands[:]
+        self._shake_commands.clear()
         # Set the shake commands.
         # Shake the container.
-        for i in range(25):
-            forceval = uniform(-1.5, 1.5)
-            rot_axis = choice(["pitch", "roll", "yaw"])
-            rotval = uniform(-2, 2)
+        # Sample the force, rotation axis, and rotation angle of every shake at once.
+        num_shakes = 25
+        forcevals = self._rng.uniform(-1.5, 1.5, num_shakes).tolist()
+        rot_axes = self._rng.choice(["pitch", "roll", "yaw"], num_shakes).tolist()
+        rotvals = self._rng.uniform(-2, 2, num_shakes).tolist()
+        for forceval, rot_axis, rotval in zip(forcevals, rot_axes, rotvals):
             # Shake the container.
             for i in range(3):
                 self._shake_commands.append([{"$type": "apply_force_to_object",
@@ -156,10 +156,7 @@ class Containment(RigidbodiesDataset):
                                               "axis": rot_axis,
                                               "is_world": False}])
             # Reset the rotation.
-            for i in range(10):
-                self._shake_commands.append([{"$type": "rotate_object_to",
-                                              "rotation": {"w": 1, "x": 0, "y": 0, "z": 0},
-                                              "id": container_id}])
+            self._shake_commands.extend(self._get_reset_rotation(container_id))
             # Shake some more.
             for i in range(3):
                 self._shake_commands.append([{"$type": "apply_force_to_object",
@@ -171,10 +168,7 @@ class Containment(RigidbodiesDataset):
                                               "axis": rot_axis,
                                               "is_world": False}])
             # Reset the rotation.
-            for i in range(10):
-                self._shake_commands.append([{"$type": "rotate_object_to",
-                                              "rotation": {"w": 1, "x": 0, "y": 0, "z": 0},
-                                              "id": container_id}])
+            self._shake_commands.extend(self._get_reset_rotation(container_id))
             # Shake some more.
             for i in range(4):
                 self._shake_commands.append([{"$type": "apply_force_to_object",
@@ -186,18 +180,27 @@ class Containment(RigidbodiesDataset):
                                               "axis": rot_axis,
                                               "is_world": False}])
             # Reset the rotation.
-            for i in range(10):
-                self._shake_commands.append([{"$type": "rotate_object_to",
-                                              "rotation": {"w": 1, "x": 0, "y": 0, "z": 0},
-                                              "id": container_id}])
+            self._shake_commands.extend(self._get_reset_rotation(container_id))
         self._max_num_frames = len(self._shake_commands) + 500
 
         return commands
 
+    @staticmethod
+    def _get_reset_rotation(container_id: int) -> List[List[dict]]:
+        """
+        :param container_id: The ID of the container.
+
+        :return: 10 frames of commands that reset the rotation of the container.
+        """
+
+        return [[{"$type": "rotate_object_to",
+                  "rotation": {"w": 1, "x": 0, "y": 0, "z": 0},
+                  "id": container_id}] for _ in range(10)]
+
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
         # Send the next list of shake commands.
         if len(self._shake_commands) > 0:
-            return self._shake_commands.pop(0)
+            return self._shake_commands.popleft()
         else:
             return []
 
@@ -207,4 +210,5 @@ class Containment(RigidbodiesDataset):
 
 if __name__ == "__main__":
     args = get_args("containment")
-    Containment().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Containment(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
@@ -5,7 +5,7 @@ import numpy as np
 from tdw.output_data import FlexParticles
 from tdw.tdw_utils import TDWUtils
 from tdw_physics.cloth_dataset import ClothDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs
 
 
 class Dragging(ClothDataset):
@@ -19,8 +19,8 @@ class Dragging(ClothDataset):
                                 np.array([-1, 0, -1]),
                                 np.array([-1, 0, 1])]
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
         # The number of frames during which a force will be applied.
         self._num_force_frames: int = 0
         self._corner: np.array = self._CORNERS[0]
@@ -98,7 +98,8 @@ class Dragging(ClothDataset):
                          {"$type": "step_physics",
                           "frames": 100},
                          {"$type": "teleport_avatar_to",
-                          "position": self.get_random_avatar_position(1.8, 2.1, 1, 1.3, TDWUtils.VECTOR3_ZERO)},
+                          "position": self.get_random_avatar_position(1.8, 2.1, 1, 1.3, TDWUtils.VECTOR3_ZERO,
+                                                                      rng=self._rng)},
                          {"$type": "look_at",
                           "id": self.cloth_id,
                           "use_centroid": True},
@@ -138,4 +139,5 @@ class Dragging(ClothDataset):
 
 if __name__ == "__main__":
     args = get_args("dragging")
-    Dragging().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Dragging(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
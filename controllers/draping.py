@@ -2,7 +2,7 @@ from pathlib import Path
 from random import choice, uniform, random
 from typing import List
 from tdw_physics.cloth_dataset import ClothDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs
 
 
 class Draping(ClothDataset):
@@ -11,6 +11,12 @@ class Draping(ClothDataset):
     20% of the time, no object is selected.
     """
 
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
+
+        self._per_frame_commands = [{"$type": "focus_on_object",
+                                     "object_id": self.cloth_id}]
+
     def get_scene_initialization_commands(self) -> List[dict]:
         return [self.get_add_scene(scene_name="tdw_room"),
                 {"$type": "set_aperture",
@@ -81,10 +87,10 @@ class Draping(ClothDataset):
         return trial_commands
 
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
-        return [{"$type": "focus_on_object",
-                 "object_id": self.cloth_id}]
+        return self._per_frame_commands
 
 
 if __name__ == "__main__":
     args = get_args("draping")
-    Draping().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Draping(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
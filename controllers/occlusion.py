@@ -1,19 +1,19 @@
 import numpy as np
-from typing import List
+from typing import List, Deque
+from collections import deque
 import random
-from tdw.controller import Controller
-from tdw.librarian import ModelRecord, ModelLibrarian
+import math
+from tdw.librarian import ModelRecord
 from tdw.tdw_utils import TDWUtils
 from tdw_physics.transforms_dataset import TransformsDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs, get_model_librarian
 
 
 class Occlusion(TransformsDataset):
-    def __init__(self, port: int = 1071):
-        Controller.MODEL_LIBRARIANS["models_full.json"] = ModelLibrarian("models_full.json")
+    def __init__(self, port: int = 1071, **kwargs):
         self.small_models: List[ModelRecord] = []
         self.big_models: List[ModelRecord] = []
-        for record in Controller.MODEL_LIBRARIANS["models_full.json"].records:
+        for record in get_model_librarian("models_full.json").records:
             if record.do_not_use or record.composite_object or record.asset_bundle_sizes["Windows"] > 1000000:
                 continue
             bounds = record.bounds
@@ -25,9 +25,9 @@ class Occlusion(TransformsDataset):
             if 0.75 < s <= 2.5:
                 self.big_models.append(record)
 
-        self.per_frame_commands: List[List[dict]] = []
+        self.per_frame_commands: Deque[List[dict]] = deque()
 
-        super().__init__(port=port)
+        super().__init__(port=port, **kwargs)
 
     def get_scene_initialization_commands(self) -> List[dict]:
         return [self.get_add_scene(scene_name="tdw_room"),
@@ -48,7 +48,7 @@ class Occlusion(TransformsDataset):
         return 35
 
     def get_trial_initialization_commands(self) -> List[dict]:
-        del self.per_frame_commands[:]
+        self.per_frame_commands.clear()
         commands = []
         # Add a big object in the center.
         big_id = self.get_unique_id()
@@ -60,37 +60,40 @@ class Occlusion(TransformsDataset):
                                             rotation={"x": 0, "y": random.uniform(0, 360), "z": 0}))
         # Add a small object nearby.
         o_r = random.uniform(1, 2.)
-        theta = np.radians(random.uniform(0, 360))
+        theta = math.radians(random.uniform(0, 360))
         record = random.choice(self.small_models)
         commands.append(self.get_add_object(model_name=record.name,
                                             object_id=self.get_unique_id(),
                                             library="models_full.json",
-                                            position={"x": np.cos(theta) * o_r, "y": 0, "z": np.sin(theta) * o_r},
+                                            position={"x": math.cos(theta) * o_r, "y": 0, "z": math.sin(theta) * o_r},
                                             rotation={"x": 0, "y": random.uniform(0, 360), "z": 0}))
         a_r = random.uniform(2.1, 3)
         d_theta = random.uniform(0.5, 3)
         a_y = random.uniform(0.4, 0.9)
-        for theta in np.arange(0, 360, d_theta):
+        # Get every position of the avatar along its orbit at once.
+        thetas = np.radians(np.arange(0, 360, d_theta))
+        for a_x, a_z in zip((np.cos(thetas) * a_r).tolist(), (np.sin(thetas) * a_r).tolist()):
             self.per_frame_commands.append([{"$type": "teleport_avatar_to",
-                                             "position": {"x": np.cos(np.radians(theta)) * a_r,
+                                             "position": {"x": a_x,
                                                           "y": a_y,
-                                                          "z": np.sin(np.radians(theta)) * a_r}},
+                                                          "z": a_z}},
                                             {"$type": "look_at",
                                              "object_id": big_id,
                                              "use_centroid": True},
                                             {"$type": "focus_on_object",
                                              "object_id": big_id,
                                              "use_centroid": True}])
-        commands.extend(self.per_frame_commands.pop(0))
+        commands.extend(self.per_frame_commands.popleft())
         return commands
 
     def is_done(self, resp: List[bytes], frame: int) -> bool:
         return len(self.per_frame_commands) == 0
 
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
-        return self.per_frame_commands.pop(0)
+        return self.per_frame_commands.popleft()
 
 
 if __name__ == "__main__":
     args = get_args("occlusion")
-    Occlusion().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Occlusion(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
@@ -1,11 +1,12 @@
 from typing import List
 import random
 from pathlib import Path
+import numpy as np
 from tdw.librarian import ModelLibrarian, ModelRecord, MaterialLibrarian
 from tdw.tdw_utils import TDWUtils
 from tdw.output_data import OutputData, Transforms, IdPassSegmentationColors
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs
 
 
 class Permanence(RigidbodiesDataset):
@@ -18,19 +19,24 @@ class Permanence(RigidbodiesDataset):
                        "concrete_terrazzo", "fabric_vinyl_heavy", "gold_natural", "marble_crema_valencia",
                        "marble_griotte", "plastic_stripes", "plastic_vinyl_glossy_green", "plastic_vinyl_glossy_blue",
                        "plastic_vinyl_glossy_orange"]
+    # Lower and upper bounds of the ball's random values, sampled in one call per trial:
+    # x, z, mass, dynamic friction, static friction, bounciness, spin angle, spin force.
+    _BALL_LOWS = np.array([-2.6, 1.25, 1, 0, 0, 0, 30, 1])
+    _BALL_HIGHS = np.array([-2.2, 1.45, 4, 0.1, 0.1, 0.1, 45, 3])
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
 
         self._occluders: List[ModelRecord] = ModelLibrarian(str(Path("occluders.json").resolve())).records
         self._ball = ModelLibrarian("models_flex.json").get_record("sphere")
         self._ball_id = 0
         self._occ_id = 1
         self.material_librarian = MaterialLibrarian()
+        self._per_frame_commands = [{"$type": "focus_on_object",
+                                     "object_id": self._ball_id}]
 
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
-        return [{"$type": "focus_on_object",
-                 "object_id": self._ball_id}]
+        return self._per_frame_commands
 
     def get_scene_initialization_commands(self) -> List[dict]:
         return [self.get_add_scene(scene_name="box_room_2018"),
@@ -56,13 +62,17 @@ class Permanence(RigidbodiesDataset):
         # The ball must have a positive x coordinate (moving away from occluder) and be out of frame.
         positive_x = False
         segmentation_color = False
-        for r in resp:
+        for r in resp[:-1]:
             r_id = OutputData.get_data_type_id(r)
             if r_id == "tran":
                 t = Transforms(r)
                 for i in range(t.get_num()):
                     if t.get_id(i) == self._ball_id:
                         positive_x = t.get_position(i)[0] >= 2
+                        break
+                # The ball is still moving towards the occluder, so there's no need to check the segmentation colors.
+                if not positive_x:
+                    return False
             elif r_id == "ipsc":
                 ip = IdPassSegmentationColors(r)
                 segmentation_color = ip.get_num_segmentation_colors() == 1
@@ -72,19 +82,20 @@ class Permanence(RigidbodiesDataset):
     def get_trial_initialization_commands(self) -> List[dict]:
         commands = []
         # Add the ball.
-        mass = random.uniform(1, 4)
+        b_x, b_z, mass, dynamic_friction, static_friction, bounciness, spin_angle, spin_force = \
+            self._rng.uniform(self._BALL_LOWS, self._BALL_HIGHS).tolist()
         commands.extend(self.get_add_physics_object(model_name=self._ball.name,
                                                     library="models_flex.json",
                                                     object_id=self._ball_id,
-                                                    position={"x": random.uniform(-2.2, -2.6),
+                                                    position={"x": b_x,
                                                               "y": 0,
-                                                              "z": random.uniform(1.25, 1.45)},
+                                                              "z": b_z},
                                                     rotation=TDWUtils.VECTOR3_ZERO,
                                                     default_physics_values=False,
                                                     mass=mass,
-                                                    dynamic_friction=random.uniform(0, 0.1),
-                                                    static_friction=random.uniform(0, 0.1),
-                                                    bounciness=random.uniform(0, 0.1),
+                                                    dynamic_friction=dynamic_friction,
+                                                    static_friction=static_friction,
+                                                    bounciness=bounciness,
                                                     scale_mass=False,
                                                     scale_factor={"x": self._BALL_SCALE,
                                                                   "y": self._BALL_SCALE,
@@ -98,12 +109,12 @@ class Permanence(RigidbodiesDataset):
                           "position": {"x": 100, "y": 0, "z": 0},
                           "id": self._ball_id},
                          {"$type": "rotate_object_by",
-                          "angle": random.uniform(30, 45),
+                          "angle": spin_angle,
                           "id": self._ball_id,
                           "axis": "pitch",
                           "is_world": True},
                          {"$type": "apply_force_magnitude_to_object",
-                          "magnitude": random.uniform(1, 3),
+                          "magnitude": spin_force,
                           "id": self._ball_id},
                          {"$type": "object_look_at_position",
                           "position": {"x": 100, "y": 0, "z": 0},
@@ -147,5 +158,5 @@ class Permanence(RigidbodiesDataset):
 
 if __name__ == "__main__":
     args = get_args("permanence")
-    td = Permanence()
+    td = Permanence(**get_dataset_kwargs(args))
     td.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
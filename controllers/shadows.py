@@ -6,7 +6,7 @@ from tdw.tdw_utils import TDWUtils
 from tdw.librarian import ModelLibrarian, HDRISkyboxLibrarian, MaterialLibrarian, MaterialRecord
 from tdw.output_data import OutputData, Transforms
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs
 
 
 class _Sector:
@@ -59,17 +59,27 @@ class Shadows(RigidbodiesDataset):
                _Sector(c_0={"x": 2.15, "y": 0, "z": 2.6}, c_1={"x": 4, "y": 0, "z": 3}),
                _Sector(c_0={"x": -2.15, "y": 0, "z": 2.6}, c_1={"x": -4, "y": 0, "z": 3}),
                _Sector(c_0={"x": -2.15, "y": 0, "z": -2.6}, c_1={"x": -4, "y": 0, "z": -3})]
+    # Lower and upper bounds of the ball's random values, sampled in one call per trial:
+    # mass, dynamic friction, static friction, bounciness, spin angle, spin force, force per unit of mass.
+    _BALL_LOWS = np.array([1, 0, 0, 0, 30, 0.01, 5.2])
+    _BALL_HIGHS = np.array([4, 0.1, 0.1, 0.1, 45, 0.03, 8])
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
 
         # Cache the ball data.
         self._ball = ModelLibrarian("models_special.json").get_record("prim_sphere")
         self._ball_id = 0
+        self._per_frame_commands = [{"$type": "focus_on_object",
+                                     "object_id": self._ball_id,
+                                     "use_centroid": True}]
 
         # The position the ball starts in and the position the ball is directed at.
         self._p0: Dict[str, float] = {}
         self._p1: Dict[str, float] = {}
+        # Cached per trial for `is_done()`: the start position as an array and the distance that ends the trial.
+        self._p0_arr: np.array = np.zeros(3)
+        self._done_distance: float = 0
 
         # Cache the skybox records.
         skybox_lib = HDRISkyboxLibrarian()
@@ -103,7 +113,8 @@ class Shadows(RigidbodiesDataset):
 
         commands = []
         # Add the ball.
-        mass = random.uniform(1, 4)
+        mass, dynamic_friction, static_friction, bounciness, spin_angle, spin_force, force_per_mass = \
+            self._rng.uniform(self._BALL_LOWS, self._BALL_HIGHS).tolist()
         commands.extend(self.get_add_physics_object(model_name=self._ball.name,
                                                     library="models_special.json",
                                                     object_id=self._ball_id,
@@ -112,9 +123,9 @@ class Shadows(RigidbodiesDataset):
                                                     default_physics_values=False,
                                                     mass=mass,
                                                     scale_mass=False,
-                                                    dynamic_friction=random.uniform(0, 0.1),
-                                                    static_friction=random.uniform(0, 0.1),
-                                                    bounciness=random.uniform(0, 0.1),
+                                                    dynamic_friction=dynamic_friction,
+                                                    static_friction=static_friction,
+                                                    bounciness=bounciness,
                                                     scale_factor={"x": self._BALL_SCALE,
                                                                   "y": self._BALL_SCALE,
                                                                   "z": self._BALL_SCALE}))
@@ -123,18 +134,18 @@ class Shadows(RigidbodiesDataset):
         # Set a random visual material.
         # Add a random skybox.
         commands.extend([{"$type": "rotate_object_by",
-                          "angle": random.uniform(30, 45),
+                          "angle": spin_angle,
                           "id": self._ball_id,
                           "axis": "pitch",
                           "is_world": True},
                          {"$type": "apply_force_magnitude_to_object",
-                          "magnitude": random.uniform(0.01, 0.03),
+                          "magnitude": spin_force,
                           "id": self._ball_id},
                          {"$type": "object_look_at_position",
                           "position": self._p1,
                           "id": self._ball_id},
                          {"$type": "apply_force_magnitude_to_object",
-                          "magnitude": random.uniform(5.2 * mass, 8 * mass),
+                          "magnitude": force_per_mass * mass,
                           "id": self._ball_id},
                          {"$type": "add_material",
                           "name": ball_material.name,
@@ -149,6 +160,8 @@ class Shadows(RigidbodiesDataset):
                           "angle": random.uniform(0, 360)}])
         # Teleport the avatar such that it can see both points.
         d0 = TDWUtils.get_distance(self._p0, self._p1)
+        self._p0_arr = TDWUtils.vector3_to_array(self._p0)
+        self._done_distance = d0 * 1.5
         p_med = np.array([(self._p0["x"] + self._p1["x"]) / 2, 0, (self._p0["z"] + self._p1["z"]) / 2])
         p_cen = np.array([0, 0, 0])
         a_pos = p_med + ((p_cen - p_med) / np.abs(np.linalg.norm(p_cen - p_med)) * (d0 + random.uniform(-0.01, -0.05)))
@@ -160,9 +173,7 @@ class Shadows(RigidbodiesDataset):
         return commands
 
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
-        return [{"$type": "focus_on_object",
-                 "object_id": self._ball_id,
-                 "use_centroid": True}]
+        return self._per_frame_commands
 
     def get_field_of_view(self) -> float:
         return 68
@@ -173,13 +184,11 @@ class Shadows(RigidbodiesDataset):
             # If the ball reaches or overshoots the destination, the trial is done.
             if r_id == "tran":
                 t = Transforms(r)
-                d0 = TDWUtils.get_distance(TDWUtils.array_to_vector3(t.get_position(0)), self._p0)
-                d1 = TDWUtils.get_distance(self._p0, self._p1)
-                return d0 > d1 * 1.5
+                return np.linalg.norm(t.get_position(0) - self._p0_arr) > self._done_distance
         return False
 
 
 if __name__ == "__main__":
     args = get_args("shadows")
-    td = Shadows()
+    td = Shadows(**get_dataset_kwargs(args))
     td.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
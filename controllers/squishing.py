@@ -3,11 +3,10 @@ import random
 from pathlib import Path
 from json import loads
 from typing import List, Dict, Tuple
-from tdw.controller import Controller
 from tdw.tdw_utils import TDWUtils
-from tdw.librarian import ModelLibrarian
 from tdw_physics.flex_dataset import FlexDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs, get_random_color_command, \
+    get_model_librarian
 
 
 class Squishing(FlexDataset):
@@ -20,10 +19,8 @@ class Squishing(FlexDataset):
     4. An object is pushed along the floor into another object.
     """
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
-
-        Controller.MODEL_LIBRARIANS["models_flex.json"] = ModelLibrarian("models_flex.json")
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
 
         # A list of functions that will return commands to initialize a trial.
         self.scenarios = [self.drop_onto_floor, self.drop_onto_object, self.throw_into_wall, self.push_into_other]
@@ -34,7 +31,7 @@ class Squishing(FlexDataset):
         # Cached pressure parameters per model.
         self.pressures = loads(Path("squish_pressures.json").read_text())
         # Only use records in the pressures dictionary.
-        self.records = [r for r in Controller.MODEL_LIBRARIANS["models_flex.json"].records if r.name in self.pressures]
+        self.records = [r for r in get_model_librarian("models_flex.json").records if r.name in self.pressures]
 
     def get_scene_initialization_commands(self) -> List[dict]:
         return [self.get_add_scene(scene_name="box_room_2018"),
@@ -114,9 +111,7 @@ class Squishing(FlexDataset):
                                                    "z": random.uniform(0, 360)},
                                          mass_scale=random.uniform(4, 8))
         # Set the color. Add a small downward force.
-        commands.append({"$type": "set_color",
-                         "color": {"r": random.random(), "g": random.random(), "b": random.random(), "a": 1.0},
-                         "id": solid_id})
+        commands.append(get_random_color_command(solid_id))
         commands.append(self._get_drop_force(solid_id))
         commands.extend(self._get_drop_camera(o_pos))
         # Add a second object on the floor.
@@ -170,7 +165,8 @@ class Squishing(FlexDataset):
                                                                                radius_max=0.5,
                                                                                y_min=1,
                                                                                y_max=1.5,
-                                                                               center=TDWUtils.VECTOR3_ZERO),
+                                                                               center=TDWUtils.VECTOR3_ZERO,
+                                                                               rng=self._rng),
                                          cam_aim=p1))
         return commands
 
@@ -208,7 +204,8 @@ class Squishing(FlexDataset):
                                                                                radius_max=2.3,
                                                                                y_min=1,
                                                                                y_max=1.75,
-                                                                               center=p_med),
+                                                                               center=p_med,
+                                                                               rng=self._rng),
                                          cam_aim=p1))
         return commands
 
@@ -226,7 +223,8 @@ class Squishing(FlexDataset):
                                                                       y_max=2,
                                                                       center={"x": o_pos["x"],
                                                                               "y": 0,
-                                                                              "z": o_pos["z"]}),
+                                                                              "z": o_pos["z"]},
+                                                                      rng=self._rng),
                                 cam_aim={"x": 0, "y": 0.125, "z": 0})
 
     @staticmethod
@@ -281,22 +279,19 @@ class Squishing(FlexDataset):
         :return: A list of commands to create the object, and the object ID.
         """
 
-        commands = []
         soft_id = self.get_unique_id()
         # Add the soft-body (squishable) object.
         record = random.choice(self.records)
         pressures = self.pressures[record.name]
-        commands.extend(self.add_cloth_object(model_name=record.name,
-                                              library="models_flex.json",
-                                              object_id=soft_id,
-                                              position=position,
-                                              rotation=rotation,
-                                              stretch_stiffness=1,
-                                              bend_stiffness=1,
-                                              pressure=random.uniform(pressures[0], pressures[1])))
-        commands.append({"$type": "set_color",
-                         "color": {"r": random.random(), "g": random.random(), "b": random.random(), "a": 1.0},
-                         "id": soft_id})
+        commands = [*self.add_cloth_object(model_name=record.name,
+                                           library="models_flex.json",
+                                           object_id=soft_id,
+                                           position=position,
+                                           rotation=rotation,
+                                           stretch_stiffness=1,
+                                           bend_stiffness=1,
+                                           pressure=random.uniform(pressures[0], pressures[1])),
+                    get_random_color_command(soft_id)]
         return commands, soft_id
 
     @staticmethod
@@ -324,4 +319,5 @@ class Squishing(FlexDataset):
 
 if __name__ == "__main__":
     args = get_args("squishing")
-    Squishing().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Squishing(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
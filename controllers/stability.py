@@ -1,14 +1,14 @@
 import h5py
 from enum import Enum
+import math
 import random
+import numpy as np
 from typing import List, Dict, Tuple
-from weighted_collection import WeightedCollection
-from tdw.controller import Controller
 from tdw.tdw_utils import TDWUtils
-from tdw.librarian import ModelRecord, ModelLibrarian
+from tdw.librarian import ModelRecord
 from tdw_physics.dataset import Dataset
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs, get_model_librarian
 
 
 class _StackType(Enum):
@@ -42,25 +42,64 @@ class Stability(RigidbodiesDataset):
     BASE_STABLE: List[ModelRecord] = []
     # These objects are generally unstable.
     UNSTABLE: List[ModelRecord] = []
-    Controller.MODEL_LIBRARIANS["models_flex.json"] = ModelLibrarian("models_flex.json")
-    for record in Controller.MODEL_LIBRARIANS["models_flex.json"].records:
-        if record.name in ["cube", "cylinder", "pentagon"]:
-            STABLE.append(record)
-        elif record.name in ["bowl", "pipe", "torus"]:
-            MAYBE_STABLE.append(record)
-        elif record.name in ["cone", "pyramid", "triangular_prism"]:
-            BASE_STABLE.append(record)
-        else:
-            UNSTABLE.append(record)
+    # The names of the models in each stability category.
+    STABLE_NAMES = frozenset(["cube", "cylinder", "pentagon"])
+    MAYBE_STABLE_NAMES = frozenset(["bowl", "pipe", "torus"])
+    BASE_STABLE_NAMES = frozenset(["cone", "pyramid", "triangular_prism"])
+    # If True, the records have been sorted into the stability lists.
+    _RECORDS_SORTED: bool = False
     STABLE_LISTS: Dict[_StackType, List[ModelRecord]] = {_StackType.stable: STABLE,
                                                          _StackType.maybe_stable: MAYBE_STABLE,
                                                          _StackType.base_stable: BASE_STABLE,
                                                          _StackType.unstable: UNSTABLE}
+    # Candidate record lists, grouped by how stable the objects are at their base.
+    STABLE_OR_MAYBE_STABLE: Tuple[List[ModelRecord], ...] = (STABLE, MAYBE_STABLE)
+    STABLE_AT_BASE: Tuple[List[ModelRecord], ...] = (STABLE, MAYBE_STABLE, BASE_STABLE)
+    ANY_STABILITY: Tuple[List[ModelRecord], ...] = (STABLE, MAYBE_STABLE, BASE_STABLE, UNSTABLE)
+    STACK_TYPES: Tuple[_StackType, ...] = tuple(_StackType)
+    # Weighted stack types for objects in a "maybe stable" stack, with cumulative weights for `random.choices()`.
+    MAYBE_STABLE_TYPES: Tuple[_StackType, ...] = (_StackType.stable, _StackType.maybe_stable, _StackType.base_stable,
+                                                  _StackType.unstable)
+    MAYBE_STABLE_CUM_WEIGHTS: Tuple[int, ...] = (4, 8, 9, 10)
+    # Lower and upper bounds of each object's random values:
+    # scale, (x, z) jitter, (r, g, b) color, y rotation, mass, dynamic friction, static friction, bounciness.
+    _UNIFORM_BOUNDS = np.array([[0.2, 0.23],
+                                [-0.02, 0.02],
+                                [-0.02, 0.02],
+                                [0, 1],
+                                [0, 1],
+                                [0, 1],
+                                [0, 360],
+                                [2, 7],
+                                [0, 0.9],
+                                [0, 0.9],
+                                [0, 1]])
 
-    def __init__(self, port: int = 1071):
+    def __init__(self, port: int = 1071, **kwargs):
         self._stack_type: _StackType = _StackType.stable
+        Stability._sort_records()
 
-        super().__init__(port=port)
+        super().__init__(port=port, **kwargs)
+
+    @staticmethod
+    def _sort_records() -> None:
+        """
+        Load the flex model library and sort its records by stability.
+        This is done once, the first time a controller is created, rather than when the module is imported.
+        """
+
+        if Stability._RECORDS_SORTED:
+            return
+        for record in get_model_librarian("models_flex.json").records:
+            if record.name in Stability.STABLE_NAMES:
+                Stability.STABLE.append(record)
+            elif record.name in Stability.MAYBE_STABLE_NAMES:
+                Stability.MAYBE_STABLE.append(record)
+            elif record.name in Stability.BASE_STABLE_NAMES:
+                Stability.BASE_STABLE.append(record)
+            else:
+                Stability.UNSTABLE.append(record)
+        Stability._RECORDS_SORTED = True
 
     def get_field_of_view(self) -> float:
         return 55
@@ -79,14 +118,12 @@ class Stability(RigidbodiesDataset):
     def get_trial_initialization_commands(self) -> List[dict]:
         commands = []
         # Get a random stack type.
-        self._stack_type = random.choice([st for st in _StackType])
+        self._stack_type = random.choice(self.STACK_TYPES)
         num_objects = random.randint(4, 7)
+        # Sample all of the random values of every object at once. Each row is one object.
+        values = self._rng.uniform(self._UNIFORM_BOUNDS[:, 0], self._UNIFORM_BOUNDS[:, 1],
+                                   size=(num_objects, len(self._UNIFORM_BOUNDS))).tolist()
 
-        maybe_stable = WeightedCollection(_StackType)
-        maybe_stable.add_many({_StackType.stable: 4,
-                               _StackType.maybe_stable: 4,
-                               _StackType.base_stable: 1,
-                               _StackType.unstable: 1})
         y = 0
         for i in range(num_objects):
             # Choose the next object based on the target stability of the stack.
@@ -96,36 +133,39 @@ class Stability(RigidbodiesDataset):
                     record = random.choice(self.STABLE)
                 # Pick something with a stable bottom for the top of the stack.
                 else:
-                    records = random.choice([self.STABLE, self.MAYBE_STABLE, self.BASE_STABLE])
+                    records = random.choice(self.STABLE_AT_BASE)
                     record = random.choice(records)
             elif self._stack_type == _StackType.maybe_stable:
                 # Get an object that is *likely* to be "stable".
                 if i < num_objects - 1:
-                    records = self.STABLE_LISTS[maybe_stable.get()]
+                    records = self.STABLE_LISTS[random.choices(self.MAYBE_STABLE_TYPES,
+                                                               cum_weights=self.MAYBE_STABLE_CUM_WEIGHTS)[0]]
                     record = random.choice(records)
                 # The top object can be anything.
                 else:
-                    records = random.choice([self.STABLE, self.MAYBE_STABLE, self.BASE_STABLE, self.UNSTABLE])
+                    records = random.choice(self.ANY_STABILITY)
                     record = random.choice(records)
             elif self._stack_type == _StackType.base_stable:
                 # Every object except the top *might* be "stable".
                 if i < num_objects - 1:
-                    records = random.choice([self.STABLE, self.MAYBE_STABLE])
+                    records = random.choice(self.STABLE_OR_MAYBE_STABLE)
                     record = random.choice(records)
                 # The top object can be anything stable.
                 else:
-                    records = random.choice([self.STABLE, self.MAYBE_STABLE, self.BASE_STABLE])
+                    records = random.choice(self.STABLE_AT_BASE)
                     record = random.choice(records)
             elif self._stack_type == _StackType.unstable:
                 # The record can be anything.
-                records = random.choice([self.STABLE, self.MAYBE_STABLE, self.BASE_STABLE, self.UNSTABLE])
+                records = random.choice(self.ANY_STABILITY)
                 record = random.choice(records)
             else:
                 raise Exception(f"Not defined: {self._stack_type}")
 
             # Add the object.
-            scale = random.uniform(0.2, 0.23)
-            commands.extend(self._add_object_to_stack(record=record, y=y, scale=scale))
+            row = values[i]
+            scale = row[0]
+            commands.extend(self._add_object_to_stack(record=record, y=y, scale=scale, jitter=row[1:3],
+                                                      color=row[3:6], physics=row[6:]))
             # Increment the starting y positional coordinate by the previous object's height.
             y += record.bounds['top']['y'] * scale
 
@@ -136,24 +176,30 @@ class Stability(RigidbodiesDataset):
                                                 radius_max=1.3 * y,
                                                 y_min=y / 4,
                                                 y_max=y / 3,
-                                                center=TDWUtils.VECTOR3_ZERO)
+                                                center=TDWUtils.VECTOR3_ZERO,
+                                                rng=self._rng)
         cam_aim = {"x": 0, "y": y * 0.5, "z": 0}
+        # The aim point is on the y axis, so only the y component of the distance needs an offset.
+        d_y = a_pos["y"] - cam_aim["y"]
+        focus_distance = math.sqrt(a_pos["x"] * a_pos["x"] + d_y * d_y + a_pos["z"] * a_pos["z"])
+        pitch, yaw = self._rng.uniform(-5, 5, 2).tolist()
+        force_x, force_z = self._rng.uniform(-0.05, 0.05, 2).tolist()
         commands.extend([{"$type": "teleport_avatar_to",
                           "position": a_pos},
                          {"$type": "look_at_position",
                           "position": cam_aim},
                          {"$type": "set_focus_distance",
-                          "focus_distance": TDWUtils.get_distance(a_pos, cam_aim)},
+                          "focus_distance": focus_distance},
                          {"$type": "rotate_sensor_container_by",
                           "axis": "pitch",
-                          "angle": random.uniform(-5, 5)},
+                          "angle": pitch},
                          {"$type": "rotate_sensor_container_by",
                           "axis": "yaw",
-                          "angle": random.uniform(-5, 5)},
+                          "angle": yaw},
                          {"$type": "apply_force_to_object",
-                          "force": {"x": random.uniform(-0.05, 0.05),
+                          "force": {"x": force_x,
                                     "y": 0,
-                                    "z": random.uniform(-0.05, 0.05)},
+                                    "z": force_z},
                           "id": int(Dataset.OBJECT_IDS[0])}])
         return commands
 
@@ -169,44 +215,49 @@ class Stability(RigidbodiesDataset):
     def is_done(self, resp: List[bytes], frame: int) -> bool:
         return frame > 500
 
-    def _add_object_to_stack(self, record: ModelRecord, y: float, scale: float) -> List[dict]:
+    def _add_object_to_stack(self, record: ModelRecord, y: float, scale: float, jitter: List[float],
+                             color: List[float], physics: List[float]) -> List[dict]:
         """
         Add a primitive to the stack. Assign random physics values and colors.
 
         :param record: The model record.
         :param y: The object's y positional coordinate.
         :param scale: The object's scale.
+        :param jitter: The object's (x, z) positional offset from the center of the stack.
+        :param color: The object's (r, g, b) color.
+        :param physics: The object's y rotation, mass, dynamic friction, static friction, and bounciness.
 
         :return: A list of commands to add the object.
         """
 
         o_id = self.get_unique_id()
+        rotation, mass, dynamic_friction, static_friction, bounciness = physics
 
         # Add the object with random physics values.
-        commands = []
-        commands.extend(self.get_add_physics_object(model_name=record.name,
-                                                    library="models_flex.json",
-                                                    object_id=o_id,
-                                                    position={"x": random.uniform(-0.02, 0.02),
-                                                              "y": y,
-                                                              "z": random.uniform(-0.02, 0.02)},
-                                                    rotation={"x": 0,
-                                                              "y": random.uniform(0, 360),
-                                                              "z": 0},
-                                                    default_physics_values=False,
-                                                    scale_mass=False,
-                                                    mass=random.uniform(2, 7),
-                                                    dynamic_friction=random.uniform(0, 0.9),
-                                                    static_friction=random.uniform(0, 0.9),
-                                                    bounciness=random.uniform(0, 1),
-                                                    scale_factor={"x": scale, "y": scale, "z": scale}))
-        # Set a random color.
+        commands = self.get_add_physics_object(model_name=record.name,
+                                               library="models_flex.json",
+                                               object_id=o_id,
+                                               position={"x": jitter[0],
+                                                         "y": y,
+                                                         "z": jitter[1]},
+                                               rotation={"x": 0,
+                                                         "y": rotation,
+                                                         "z": 0},
+                                               default_physics_values=False,
+                                               scale_mass=False,
+                                               mass=mass,
+                                               dynamic_friction=dynamic_friction,
+                                               static_friction=static_friction,
+                                               bounciness=bounciness,
+                                               scale_factor={"x": scale, "y": scale, "z": scale})
+        # Set the color.
         commands.append({"$type": "set_color",
-                         "color": {"r": random.random(), "g": random.random(), "b": random.random(), "a": 1.0},
+                         "color": {"r": color[0], "g": color[1], "b": color[2], "a": 1.0},
                          "id": o_id})
         return commands
 
 
 if __name__ == "__main__":
     args = get_args("stability")
-    Stability().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Stability(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
@@ -1,6 +1,6 @@
 from tdw_physics.flex_dataset import FlexDataset
 from tdw.librarian import ModelLibrarian
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs
 from tdw_physics.rigidbodies_dataset import PHYSICS_INFO
 from tdw.controller import Controller
 from random import choice, uniform
@@ -15,9 +15,8 @@ class Submerge(FlexDataset):
     Run several trials, dropping ball objects of increasing mass into the fluid.
     """
 
-    Controller.MODEL_LIBRARIANS["models_full.json"] = ModelLibrarian("models_full.json")
 
-    def __init__(self):
+    def __init__(self, port: int = 1071, **kwargs):
         self.model_list = ["b03_db_apps_tech_08_04",
                            "trashbin",
                            "trunck",
@@ -55,7 +54,7 @@ class Submerge(FlexDataset):
         # Cache the record for the receptacle.
         self.receptacle_record = ModelLibrarian("models_special.json").get_record("fluid_receptacle1x1")
         self.pool_id = None
-        super().__init__()
+        super().__init__(port=port, **kwargs)
 
     def get_scene_initialization_commands(self) -> List[dict]:
         if system() != "Windows":
@@ -165,4 +164,5 @@ class Submerge(FlexDataset):
 
 if __name__ == "__main__":
     args = get_args("submerging")
-    Submerge().run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
+    c = Submerge(**get_dataset_kwargs(args))
+    c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
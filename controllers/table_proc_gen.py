@@ -1,10 +1,12 @@
 from abc import ABC
-from typing import List, Dict
+from typing import List, Dict, Deque
+from collections import deque
 import random
 from tdw.controller import Controller
 from tdw.tdw_utils import TDWUtils
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset, PHYSICS_INFO
-from tdw_physics.util import get_move_along_direction, get_object_look_at
+from tdw_physics.util import get_move_along_direction, get_object_look_at, get_args, \
+    get_dataset_kwargs
 
 
 class _TableSetting:
@@ -130,8 +132,8 @@ class _TableProcGen(RigidbodiesDataset, ABC):
                        "cinderblock_wall",
                        "concrete_worn_scratched"]
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
 
         self._table_id = 0
         self._table_name = ""
@@ -156,7 +158,7 @@ class _TableProcGen(RigidbodiesDataset, ABC):
     def get_trial_initialization_commands(self) -> List[dict]:
         self._table_id = Controller.get_unique_id()
         self._a_pos = self.get_random_avatar_position(radius_min=1.7, radius_max=2.3, y_min=1.8, y_max=2.5,
-                                                      center=TDWUtils.VECTOR3_ZERO)
+                                                      center=TDWUtils.VECTOR3_ZERO, rng=self._rng)
         # Teleport the avatar.
         commands = []
         # Add the table.
@@ -175,7 +177,9 @@ class _TableProcGen(RigidbodiesDataset, ABC):
                           "object_id": self._table_id,
                           "use_centroid": True}])
         table_record = PHYSICS_INFO[self._table_name].record
-        top = table_record.bounds["top"]
+        top_y = table_record.bounds["top"]["y"]
+        # The center of the table top. Plates are moved towards this.
+        table_center = {"x": 0, "y": top_y, "z": 0}
         # Select random model names.
         chair_name = random.choice(self._CHAIRS)
         plate_name = random.choice(self._PLATES)
@@ -183,6 +187,10 @@ class _TableProcGen(RigidbodiesDataset, ABC):
         spoon_name = random.choice(self._SPOONS)
         knife_name = random.choice(self._KNIVES)
         cup_name = random.choice(self._CUPS)
+        # Use the plate bounds to add food on top of the plates.
+        food_y = top_y + Controller.MODEL_LIBRARIANS["models_full.json"].get_record(plate_name).bounds["top"]["y"] + \
+            0.001
+        cutlery_names = [fork_name, knife_name, spoon_name, cup_name]
         # Get the chair positions.
         setting_positions = [table_record.bounds["left"],
                              table_record.bounds["right"],
@@ -211,8 +219,8 @@ class _TableProcGen(RigidbodiesDataset, ABC):
                                                noise=5))
 
             # Set the plates on top of the table and moved in a bit.
-            plate_pos = get_move_along_direction(pos={"x": setting_pos["x"], "y": top["y"], "z": setting_pos["z"]},
-                                                 target={"x": 0, "y": top["y"], "z": 0},
+            plate_pos = get_move_along_direction(pos={"x": setting_pos["x"], "y": top_y, "z": setting_pos["z"]},
+                                                 target=table_center,
                                                  d=random.uniform(0.1, 0.125),
                                                  noise=0.01)
             # Add a plate.
@@ -223,11 +231,9 @@ class _TableProcGen(RigidbodiesDataset, ABC):
                                                         rotation=TDWUtils.VECTOR3_ZERO))
             # Maybe add food on the plate.
             if random.random() > 0.33:
-                # Use the plate bounds to add the food on top of the plate.
-                plate_bounds = Controller.MODEL_LIBRARIANS["models_full.json"].get_record(plate_name).bounds
                 food_id = Controller.get_unique_id()
                 food_pos = {"x": plate_pos["x"] + random.uniform(-0.02, 0.02),
-                            "y": top["y"] + plate_bounds["top"]["y"] + 0.001,
+                            "y": food_y,
                             "z": plate_pos["z"] + random.uniform(-0.02, 0.02)}
                 commands.extend(self.get_add_physics_object(model_name=random.choice(self._FOOD),
                                                             library="models_full.json",
@@ -239,7 +245,7 @@ class _TableProcGen(RigidbodiesDataset, ABC):
                 commands.append({"$type": "scale_object",
                                  "id": food_id,
                                  "scale_factor": {"x": c_s, "y": c_s, "z": c_s}})
-            for cutlery, offset in zip([fork_name, knife_name, spoon_name, cup_name],
+            for cutlery, offset in zip(cutlery_names,
                                        [s_p.fork_offset, s_p.knife_offset, s_p.spoon_offset, s_p.cup_offset]):
                 # Maybe add cutlery at this position.
                 if random.random() > 0.25:
@@ -248,7 +254,7 @@ class _TableProcGen(RigidbodiesDataset, ABC):
                                                                 object_id=Controller.get_unique_id(),
                                                                 library="models_full.json",
                                                                 position={"x": plate_pos["x"] + offset["x"],
-                                                                          "y": top["y"],
+                                                                          "y": top_y,
                                                                           "z": plate_pos["z"] + offset["z"]},
                                                                 rotation={"x": 0,
                                                                           "y": s_p.cutlery_rotation,
@@ -258,7 +264,7 @@ class _TableProcGen(RigidbodiesDataset, ABC):
             commands.extend(self.get_add_physics_object(model_name=random.choice(self._CENTERPIECES),
                                                         object_id=Controller.get_unique_id(),
                                                         library="models_full.json",
-                                                        position={"x": 0, "y": top["y"], "z": 0},
+                                                        position=table_center,
                                                         rotation={"x": 0,
                                                                   "y": random.uniform(-89, 89),
                                                                   "z": 0}))
@@ -270,12 +276,14 @@ class TableProcGenTilt(_TableProcGen):
     Tilt a table in a pre-scripted room.
     """
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
 
         self._tip_table_frames = 0
-        self._tip_table_force = 0
-        self._tip_pos: Dict[str, float] = {}
+        # Per-frame commands while the table is tipping, on the frame it stops, and afterwards.
+        self._tip_commands: List[dict] = []
+        self._stop_tip_commands: List[dict] = []
+        self._focus_commands: List[dict] = []
 
     def get_trial_initialization_commands(self) -> List[dict]:
         commands = super().get_trial_initialization_commands()
@@ -284,37 +292,43 @@ class TableProcGenTilt(_TableProcGen):
                          table_record.bounds["back"],
                          table_record.bounds["left"],
                          table_record.bounds["right"]]
-        self._tip_pos = random.choice(tip_positions)
-        self._tip_pos["y"] = 0
+        tip_pos = random.choice(tip_positions)
         self._tip_table_frames = random.randint(60, 80)
         # Calculate the table force from a pre-determined value using quatre_dining_table's mass.
-        self._tip_table_force = random.uniform(15, 16.5) * PHYSICS_INFO[table_record.name].mass / 300
+        tip_table_force = random.uniform(15, 16.5) * PHYSICS_INFO[table_record.name].mass / 300
+        # The per-frame commands only change per trial, so build them now.
+        focus = {"$type": "focus_on_object",
+                 "object_id": self._table_id,
+                 "use_centroid": True}
+        self._focus_commands = [focus]
+        # Tip the table up.
+        # Copy the tip position rather than modifying the cached record's bounds.
+        self._tip_commands = [focus,
+                              {"$type": "apply_force_at_position",
+                               "id": self._table_id,
+                               "position": {"x": tip_pos["x"], "y": 0, "z": tip_pos["z"]},
+                               "force": {"x": 0, "y": tip_table_force, "z": 0}}]
+        # Make the table kinematic to allow it to hang in the air.
+        # Set the detection mode to continuous speculative in order to continue to detect collisions.
+        self._stop_tip_commands = [focus,
+                                   {"$type": "set_object_collision_detection_mode",
+                                    "id": self._table_id,
+                                    "mode": "continuous_speculative"},
+                                   {"$type": "set_kinematic_state",
+                                    "use_gravity": False,
+                                    "is_kinematic": True,
+                                    "id": self._table_id}]
         return commands
 
     def is_done(self, resp: List[bytes], frame: int) -> bool:
         return frame >= 300
 
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
-        commands = [{"$type": "focus_on_object",
-                     "object_id": self._table_id,
-                     "use_centroid": True}]
-        # Tip the table up.
         if frame < self._tip_table_frames:
-            commands.extend([{"$type": "apply_force_at_position",
-                              "id": self._table_id,
-                              "position": self._tip_pos,
-                              "force": {"x": 0, "y": self._tip_table_force, "z": 0}}])
+            return self._tip_commands
         elif frame == self._tip_table_frames:
-            # Make the table kinematic to allow it to hang in the air.
-            # Set the detection mode to continuous speculative in order to continue to detect collisions.
-            commands.extend([{"$type": "set_object_collision_detection_mode",
-                              "id": self._table_id,
-                              "mode": "continuous_speculative"},
-                             {"$type": "set_kinematic_state",
-                              "use_gravity": False,
-                              "is_kinematic": True,
-                              "id": self._table_id}])
-        return commands
+            return self._stop_tip_commands
+        return self._focus_commands
 
 
 class TableProcGenFalling(_TableProcGen):
@@ -322,45 +336,36 @@ class TableProcGenFalling(_TableProcGen):
     Small objects fly up and then fall down.
     """
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
         # Commands to be sent per-frame.
-        self._per_frame_commands: List[List[dict]] = []
-        self._num_per_frame_commands = 0
+        self._per_frame_commands: Deque[List[dict]] = deque()
+        # The trial ends 300 frames after the last per-frame command.
+        self._last_frame = 0
 
     def get_trial_initialization_commands(self) -> List[dict]:
         commands = super().get_trial_initialization_commands()
 
-        del self._per_frame_commands[:]
-        self._per_frame_commands = self.get_falling_commands()
-        self._num_per_frame_commands = len(self._per_frame_commands)
+        self._per_frame_commands = deque(self.get_falling_commands())
+        self._last_frame = len(self._per_frame_commands) + 300
         return commands
 
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
         if len(self._per_frame_commands) > 0:
-            return self._per_frame_commands.pop(0)
+            return self._per_frame_commands.popleft()
         else:
             return []
 
     def is_done(self, resp: List[bytes], frame: int) -> bool:
-        return frame > self._num_per_frame_commands + 300
+        return frame > self._last_frame
 
 
 if __name__ == "__main__":
-    from argparse import ArgumentParser
-    parser = ArgumentParser()
-    parser.add_argument("--dir", type=str, default="D:/table_procgen_tilt", help="Root output directory.")
-    parser.add_argument("--num", type=int, default=1500, help="The number of trials in the dataset.")
-    parser.add_argument("--temp", type=str, default="D:/temp.hdf5", help="Temp path for incomplete files.")
-    parser.add_argument("--scenario", type=str, choices=["tilt", "fall"], default="tilt", help="The type of scenario")
-    parser.add_argument("--width", type=int, default=256, help="Screen width in pixels.")
-    parser.add_argument("--height", type=int, default=256, help="Screen width in pixels.")
-
-    args = parser.parse_args()
+    args = get_args("table_procgen_tilt", num=1500, scenarios=["tilt", "fall"])
     if args.scenario == "tilt":
-        c = TableProcGenTilt()
+        c = TableProcGenTilt(**get_dataset_kwargs(args))
     elif args.scenario == "fall":
-        c = TableProcGenFalling()
+        c = TableProcGenFalling(**get_dataset_kwargs(args))
     else:
         raise Exception(f"Scenario not defined: {args.scenario}")
     c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
@@ -1,11 +1,12 @@
 from abc import ABC
-from typing import List, Dict
+from typing import List, Dict, Deque
+from collections import deque
 from operator import add
 import random
 from tdw.controller import Controller
-from tdw.librarian import ModelLibrarian
 from tdw.tdw_utils import TDWUtils
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset
+from tdw_physics.util import get_args, get_dataset_kwargs, get_model_librarian
 
 
 class _TableScripted(RigidbodiesDataset, ABC):
@@ -25,10 +26,11 @@ class _TableScripted(RigidbodiesDataset, ABC):
                          {"x": -8.1, "y": 2.5, "z": -6.0},
                          {"x": -11.0, "y": 3.65, "z": -5.8}]
     _TABLE_POSITION = {"x": -10.8, "y": 1.0, "z": -5.5}
-    Controller.MODEL_LIBRARIANS["models_full.json"] = ModelLibrarian("models_full.json")
+    # The scale factor of incidental objects that need further scaling.
+    _INCIDENTAL_SCALE_FACTOR = {"x": 0.254, "y": 0.254, "z": 0.254}
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
         self._table_id = 0
 
     def get_scene_initialization_commands(self) -> List[dict]:
@@ -127,34 +129,29 @@ class _TableScripted(RigidbodiesDataset, ABC):
                                 {"x": -11.525, "y": _TableScripted._TABLE_HEIGHT, "z": -5.625},
                                 {"x": -11.25, "y": _TableScripted._TABLE_HEIGHT, "z": -5.185},
                                 {"x": -10.5, "y": _TableScripted._TABLE_HEIGHT, "z": -5.05}]
-        random.shuffle(incidental_names)
-        random.shuffle(incidental_positions)
         # Select 4 incidental objects.
-        for i in range(4):
-            name = incidental_names.pop(0)
+        for name, position in zip(random.sample(incidental_names, 4), random.sample(incidental_positions, 4)):
             o_id = Controller.get_unique_id()
             commands.extend(self.get_add_physics_object(model_name=name,
-                                                        object_id=self.get_unique_id(),
+                                                        object_id=o_id,
                                                         library="models_full.json",
-                                                        position=incidental_positions.pop(0),
+                                                        position=position,
                                                         rotation=TDWUtils.VECTOR3_ZERO))
             # These objects need further scaling.
-            if name in ["salt_shaker", "peppermill"]:
+            if name in {"salt_shaker", "peppermill"}:
                 commands.append({"$type": "scale_object",
                                  "id": o_id,
-                                 "scale_factor": {"x": 0.254, "y": 0.254, "z": 0.254}})
+                                 "scale_factor": self._INCIDENTAL_SCALE_FACTOR})
         # Select 2 bread objects.
         bread_names = ["bread", "bread_01", "bread_02", "bread_03"]
         bread_positions = [{"x": x2, "y": _TableScripted._TABLE_HEIGHT, "z": z2},
                            {"x": x4, "y": _TableScripted._TABLE_HEIGHT, "z": z2},
                            {"x": x3, "y": _TableScripted._TABLE_HEIGHT, "z": z2}]
-        random.shuffle(bread_names)
-        random.shuffle(bread_positions)
-        for i in range(2):
-            commands.extend(self.get_add_physics_object(model_name=bread_names.pop(0),
+        for name, position in zip(random.sample(bread_names, 2), random.sample(bread_positions, 2)):
+            commands.extend(self.get_add_physics_object(model_name=name,
                                                         object_id=self.get_unique_id(),
                                                         library="models_full.json",
-                                                        position=bread_positions.pop(0),
+                                                        position=position,
                                                         rotation=TDWUtils.VECTOR3_ZERO))
         return commands
 
@@ -164,20 +161,17 @@ class TableScriptedTilt(_TableScripted):
     Tilt a table in a pre-scripted room.
     """
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
         self._tip_table_frames = 0
         self._tip_table_force = 0
-        table_record = Controller.MODEL_LIBRARIANS["models_full.json"].get_record("quatre_dining_table")
-        self._tip_positions = [table_record.bounds["front"],
-                               table_record.bounds["back"],
-                               table_record.bounds["left"],
-                               table_record.bounds["right"]]
+        table_record = get_model_librarian("models_full.json").get_record("quatre_dining_table")
         # Set the y value of each tip position to the floor height and offset the x,z values by the table position.
-        for tip_position in self._tip_positions:
-            tip_position["y"] = self._FLOOR_HEIGHT
-            tip_position["x"] += self._TABLE_POSITION["x"]
-            tip_position["z"] += self._TABLE_POSITION["z"]
+        # These are copies; the cached record's bounds aren't modified.
+        self._tip_positions = [{"x": table_record.bounds[side]["x"] + self._TABLE_POSITION["x"],
+                                "y": self._FLOOR_HEIGHT,
+                                "z": table_record.bounds[side]["z"] + self._TABLE_POSITION["z"]}
+                               for side in ["front", "back", "left", "right"]]
         self._tip_pos: Dict[str, float] = {}
 
     def is_done(self, resp: List[bytes], frame: int) -> bool:
@@ -221,45 +215,36 @@ class TableScriptedFalling(_TableScripted):
     Small objects fly up and then fall down.
     """
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
         # Commands to be sent per-frame.
-        self._per_frame_commands: List[List[dict]] = []
-        self._num_per_frame_commands = 0
+        self._per_frame_commands: Deque[List[dict]] = deque()
+        # The trial ends 300 frames after the last per-frame command.
+        self._last_frame = 0
 
     def get_trial_initialization_commands(self) -> List[dict]:
         commands = super().get_trial_initialization_commands()
 
-        del self._per_frame_commands[:]
-        self._per_frame_commands = self.get_falling_commands()
-        self._num_per_frame_commands = len(self._per_frame_commands)
+        self._per_frame_commands = deque(self.get_falling_commands())
+        self._last_frame = len(self._per_frame_commands) + 300
         return commands
 
     def get_per_frame_commands(self, resp: List[bytes], frame: int) -> List[dict]:
         if len(self._per_frame_commands) > 0:
-            return self._per_frame_commands.pop(0)
+            return self._per_frame_commands.popleft()
         else:
             return []
 
     def is_done(self, resp: List[bytes], frame: int) -> bool:
-        return frame > self._num_per_frame_commands + 300
+        return frame > self._last_frame
 
 
 if __name__ == "__main__":
-    from argparse import ArgumentParser
-    parser = ArgumentParser()
-    parser.add_argument("--dir", type=str, default="D:/table_scripted_tilt", help="Root output directory.")
-    parser.add_argument("--num", type=int, default=1500, help="The number of trials in the dataset.")
-    parser.add_argument("--temp", type=str, default="D:/temp.hdf5", help="Temp path for incomplete files.")
-    parser.add_argument("--scenario", type=str, choices=["tilt", "fall"], default="tilt", help="The type of scenario")
-    parser.add_argument("--width", type=int, default=256, help="Screen width in pixels.")
-    parser.add_argument("--height", type=int, default=256, help="Screen width in pixels.")
-
-    args = parser.parse_args()
+    args = get_args("table_scripted_tilt", num=1500, scenarios=["tilt", "fall"])
     if args.scenario == "tilt":
-        c = TableScriptedTilt()
+        c = TableScriptedTilt(**get_dataset_kwargs(args))
     elif args.scenario == "fall":
-        c = TableScriptedFalling()
+        c = TableScriptedFalling(**get_dataset_kwargs(args))
     else:
         raise Exception(f"Scenario not defined: {args.scenario}")
     c.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
@@ -8,7 +8,7 @@ from tdw.librarian import ModelLibrarian
 from tdw_physics.dataset import Dataset
 from tdw_physics.rigidbodies_dataset import RigidbodiesDataset
 from tdw_physics.object_position import ObjectPosition
-from tdw_physics.util import get_args
+from tdw_physics.util import get_args, get_dataset_kwargs
 
 
 class ToysDataset(RigidbodiesDataset):
@@ -17,12 +17,17 @@ class ToysDataset(RigidbodiesDataset):
     Per frame, save object/physics metadata and image data.
     """
 
-    def __init__(self, port: int = 1071):
+    # The center of the circle that objects are placed in.
+    _CENTER = np.array([0, 0, 0])
+
+    def __init__(self, port: int = 1071, **kwargs):
         lib = ModelLibrarian(str(Path("toys.json").resolve()))
         self.records = lib.records
+        # The unit scale of each record never changes, so only calculate it once.
+        self._unit_scales: Dict[str, float] = {record.name: TDWUtils.get_unit_scale(record) for record in self.records}
         self._target_id: int = 0
 
-        super().__init__(port=port)
+        super().__init__(port=port, **kwargs)
 
     def get_field_of_view(self) -> float:
         return 55
@@ -57,7 +62,7 @@ class ToysDataset(RigidbodiesDataset):
             record = self.records[i]
 
             # Set randomized physics values and update the physics info.
-            scale = TDWUtils.get_unit_scale(record) * random.uniform(0.8, 1.1)
+            scale = self._unit_scales[record.name] * random.uniform(0.8, 1.1)
 
             # Get a random position.
             o_pos = self._get_object_position(object_positions=object_positions)
@@ -66,8 +71,7 @@ class ToysDataset(RigidbodiesDataset):
             commands.extend(self.get_add_physics_object(model_name=self.records[i].name,
                                                         library="models_full.json",
                                                         object_id=o_id,
-                                                        position=self._get_object_position(
-                                                            object_positions=object_positions),
+                                                        position=o_pos,
                                                         rotation={"x": 0, "y": random.uniform(-90, 90), "z": 0},
                                                         default_physics_values=False,
                                                         mass=random.uniform(1, 5),
@@ -95,7 +99,8 @@ class ToysDataset(RigidbodiesDataset):
                           "id": force_id},
                          {"$type": "teleport_avatar_to",
                           "position": self.get_random_avatar_position(radius_min=0.9, radius_max=1.5, y_min=0.5,
-                                                                      y_max=1.25, center=TDWUtils.VECTOR3_ZERO)},
+                                                                      y_max=1.25, center=TDWUtils.VECTOR3_ZERO,
+                                                                      rng=self._rng)},
                          {"$type": "look_at",
                           "object_id": self._target_id,
                           "use_centroid": True},
@@ -129,24 +134,22 @@ class ToysDataset(RigidbodiesDataset):
         :return: A valid position that doesn't interpentrate with other objects.
         """
 
-        o_pos = TDWUtils.array_to_vector3(TDWUtils.get_random_point_in_circle(center=np.array([0, 0, 0]),
-                                                                              radius=radius))
+        def get_random_position() -> np.array:
+            return TDWUtils.get_random_point_in_circle(center=ToysDataset._CENTER, radius=radius)
+
+        # Stack the other objects' positions and radii so that each candidate position is tested in one call.
+        positions = np.array([TDWUtils.vector3_to_array(o.position) for o in object_positions]).reshape(-1, 3)
+        radii = np.array([o.radius for o in object_positions])
+        o_pos = get_random_position()
         # Pick a position away from other objects.
-        ok = False
         count = 0
-        while not ok and count < max_tries:
+        while count < max_tries and np.any(np.linalg.norm(positions - o_pos, axis=1) <= radii):
             count += 1
-            ok = True
-            for o in object_positions:
-                # If the object is too close to another object, try another position.
-                if TDWUtils.get_distance(o.position, o_pos) <= o.radius:
-                    ok = False
-                    o_pos = TDWUtils.array_to_vector3(TDWUtils.get_random_point_in_circle(center=np.array([0, 0, 0]),
-                                                                                          radius=radius))
-        return o_pos
+            o_pos = get_random_position()
+        return TDWUtils.array_to_vector3(o_pos)
 
 
 if __name__ == "__main__":
     args = get_args("toy_collisions")
-    td = ToysDataset()
+    td = ToysDataset(**get_dataset_kwargs(args))
     td.run(num=args.num, output_dir=args.dir, temp_path=args.temp, width=args.width, height=args.height)
@@ -1,9 +1,8 @@
 from typing import List
 from pathlib import Path
 from abc import ABC
-from tdw.controller import Controller
-from tdw.librarian import ModelLibrarian
 from tdw_physics.flex_dataset import FlexDataset
+from tdw_physics.util import get_model_librarian
 
 
 class ClothDataset(FlexDataset, ABC):
@@ -11,15 +10,13 @@ class ClothDataset(FlexDataset, ABC):
     A dataset that includes a Flex cloth object.
     """
 
-    def __init__(self, port: int = 1071):
-        Controller.MODEL_LIBRARIANS["models_special.json"] = ModelLibrarian("models_special.json")
-        Controller.MODEL_LIBRARIANS[str(Path("flex.json").resolve())] = ModelLibrarian(str(Path("flex.json").resolve()))
+    def __init__(self, port: int = 1071, **kwargs):
         # Load the objects.
-        self.object_records = Controller.MODEL_LIBRARIANS[str(Path("flex.json").resolve())].records
+        self.object_records = get_model_librarian(str(Path("flex.json").resolve())).records
         # Get the cloth record.
-        self.cloth_record = Controller.MODEL_LIBRARIANS["models_special.json"].get_record("cloth_square")
+        self.cloth_record = get_model_librarian("models_special.json").get_record("cloth_square")
         self.cloth_id = 0
-        super().__init__(port=port)
+        super().__init__(port=port, **kwargs)
 
     def get_field_of_view(self) -> float:
         return 65
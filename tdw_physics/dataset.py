@@ -1,10 +1,12 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from abc import ABC, abstractmethod
+import os
+import math
+import random
 from pathlib import Path
 from tqdm import tqdm
 import h5py
 import numpy as np
-import random
 from tdw.controller import Controller
 from tdw.tdw_utils import TDWUtils
 
@@ -21,33 +23,64 @@ class Dataset(Controller, ABC):
         3. Clean up the scene and start a new trial.
     """
 
-    # IDs of the objects in the current trial.
-    OBJECT_IDS: np.array = np.empty(dtype=int, shape=0)
+    # Preallocated storage for object IDs. This is reused between trials and doubled in size when it's full.
+    # TDW object IDs are 3 bytes (see `Controller.get_unique_id()`), so they fit in an int32.
+    _OBJECT_IDS_STORE: np.array = np.empty(dtype=np.int32, shape=64)
+    # The number of objects in the current trial.
+    _NUM_OBJECTS: int = 0
+    # IDs of the objects in the current trial. This is a view of the first `_NUM_OBJECTS` elements of the storage.
+    OBJECT_IDS: np.array = _OBJECT_IDS_STORE[:0]
+    # Datasets smaller than this many bytes aren't compressed; the chunk overhead costs more than it saves.
+    MIN_COMPRESSION_BYTES: int = 1024
+    # If the trial file is in memory, grow it by this many bytes at a time.
+    CORE_BLOCK_SIZE: int = 64 * 1024 ** 2
+
+    def __init__(self, port: int = 1071, random_seed: int = None, compression: Optional[str] = "gzip",
+                 chunk_bytes: int = 1024 ** 2, in_memory: bool = False):
+        """
+        :param port: The socket port.
+        :param random_seed: The seed of the controller's random number generator and of Python's `random` module. If None, the seed is random.
+        :param compression: The HDF5 compression filter of large datasets, e.g. `"gzip"` or `"lzf"`. If None, nothing is compressed.
+        :param chunk_bytes: The target size in bytes of each chunk of a compressed dataset.
+        :param in_memory: If True, build each trial file in memory and write it to disk when the trial ends. This is faster, but the whole trial must fit in memory.
+        """
 
-    def __init__(self, port: int = 1071):
         super().__init__(port=port, launch_build=False)
 
+        self._compression: Optional[str] = compression
+        self._chunk_bytes: int = chunk_bytes
+        self._in_memory: bool = in_memory
+
+        # Random number generator for batched random values.
+        self._rng: np.random.Generator = np.random.default_rng(random_seed)
+        # Most of the controllers' random values still come from the `random` module, so seed it too.
+        if random_seed is not None:
+            random.seed(random_seed)
+
     def run(self, num: int, output_dir: str, temp_path: str, width: int, height: int) -> None:
         """
         Create the dataset.
 
         :param num: The number of trials in the dataset.
         :param output_dir: The root output directory.
-        :param temp_path: Temporary path to a file being written.
+        :param temp_path: Temporary path to a file being written. If this isn't on the same filesystem as `output_dir`, a temporary file in `output_dir` is used instead.
         :param width: Screen width in pixels.
         :param height: Screen height in pixels.
         """
 
-        pbar = tqdm(total=num)
         output_dir = Path(output_dir)
-        if not output_dir.exists():
-            output_dir.mkdir(parents=True)
-        temp_path = Path(temp_path)
-        if not temp_path.parent.exists():
-            temp_path.parent.mkdir(parents=True)
-        # Remove an incomplete temp path.
-        if temp_path.exists():
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # Resolve the temp path once here rather than once per trial.
+        temp_path = Path(temp_path).resolve()
+        temp_path.parent.mkdir(parents=True, exist_ok=True)
+        # Moving the temp file into the output directory is only atomic (and doesn't copy) on the same filesystem.
+        if os.stat(str(temp_path.parent)).st_dev != os.stat(str(output_dir)).st_dev:
+            temp_path = output_dir.resolve().joinpath(temp_path.name + ".tmp")
+        # Remove an incomplete temp path. (`unlink(missing_ok=True)` requires Python 3.8)
+        try:
             temp_path.unlink()
+        except FileNotFoundError:
+            pass
 
         # Global commands for all physics datasets.
         commands = [{"$type": "set_screen_size",
@@ -75,20 +108,27 @@ class Dataset(Controller, ABC):
                           "frequency": "always"}])
 
         # Skip trials that aren't on the disk, and presumably have been uploaded; jump to the highest number.
-        exists_up_to = 0
-        for f in output_dir.glob("*.hdf5"):
-            if int(f.stem) > exists_up_to:
-                exists_up_to = int(f.stem)
-        pbar.update(exists_up_to)
+        # Remember which trials exist so that we don't need to check each path again.
+        with os.scandir(str(output_dir)) as entries:
+            existing_trials = {int(e.name[:-5]) for e in entries if e.name.endswith(".hdf5")}
+        exists_up_to = max(existing_trials, default=0)
+        # Start the progress bar at the skipped trials. Trials take a long time, so smooth the ETA over more of them.
+        pbar = tqdm(total=num, initial=exists_up_to, smoothing=0.05)
 
         # Initialize the scene.
         self.communicate(commands)
 
+        previous_filepath: Optional[Path] = None
         for i in range(exists_up_to, num):
-            filepath = output_dir.joinpath(TDWUtils.zero_padding(i, 4) + ".hdf5")
-            if not filepath.exists():
+            if i not in existing_trials:
                 # Do the trial.
+                filepath = output_dir.joinpath(TDWUtils.zero_padding(i, 4) + ".hdf5")
                 self.trial(filepath=filepath, temp_path=temp_path, trial_num=i)
+                # We won't read the previous trial again, so don't let it push other data out of the page cache.
+                # By now, the OS has normally written it to disk; it can't drop pages that haven't been written yet.
+                if previous_filepath is not None:
+                    Dataset._drop_from_page_cache(previous_filepath)
+                previous_filepath = filepath
             pbar.update(1)
         pbar.close()
         self.communicate({"$type": "terminate"})
@@ -98,15 +138,23 @@ class Dataset(Controller, ABC):
         Run a trial. Write static and per-frame data to disk until the trial is done.
 
         :param filepath: The path to this trial's hdf5 file.
-        :param temp_path: The path to the temporary file.
+        :param temp_path: The resolved path to the temporary file.
         :param trial_num: The number of the current trial.
         """
 
-        # Clear the object IDs.
-        Dataset.OBJECT_IDS = np.empty(dtype=int, shape=0)
+        # Clear the object IDs. This doesn't reallocate the storage.
+        Dataset._NUM_OBJECTS = 0
+        Dataset.OBJECT_IDS = Dataset._OBJECT_IDS_STORE[:0]
 
         # Create the .hdf5 file.
-        f = h5py.File(str(temp_path.resolve()), "a")
+        # Use the 1.8+ file format; its compact object headers and link storage suit the many small frame groups.
+        # Cap it at 1.10 so that the files can still be read by older HDF5 builds.
+        if self._in_memory:
+            # Keep the file in memory and write it to the temp path in one pass when it's closed.
+            f = h5py.File(str(temp_path), "a", libver=("v108", "v110"), driver="core", backing_store=True,
+                          block_size=Dataset.CORE_BLOCK_SIZE)
+        else:
+            f = h5py.File(str(temp_path), "a", libver=("v108", "v110"))
 
         commands = []
         # Remove asset bundles (to prevent a memory leak).
@@ -133,25 +181,43 @@ class Dataset(Controller, ABC):
         # Continue the trial. Send commands, and parse output data.
         while not done:
             frame += 1
-            resp = self.communicate(self.get_per_frame_commands(resp, frame))
+            # Send a copy: `communicate()` may append to the list it's given, and subclasses may return a cached list.
+            resp = self.communicate(self.get_per_frame_commands(resp, frame)[:])
             frame_grp, objs_grp, tr_dict, done = self._write_frame(frames_grp=frames_grp, resp=resp, frame_num=frame)
             done = done or self.is_done(resp, frame)
 
-        # Cleanup.
-        commands = []
-        for o_id in Dataset.OBJECT_IDS:
-            commands.append({"$type": self._get_destroy_object_command_name(o_id),
-                             "id": int(o_id)})
-        self.communicate(commands)
+        # Cleanup. Convert the IDs to Python ints once rather than per object.
+        self.communicate([{"$type": self._get_destroy_object_command_name(o_id),
+                           "id": o_id} for o_id in Dataset.OBJECT_IDS.tolist()])
         # Close the file.
         f.close()
         # Move the file.
         temp_path.replace(filepath)
 
+    @staticmethod
+    def _drop_from_page_cache(path: Path) -> None:
+        """
+        Advise the OS that the cached pages of a file won't be needed again. This only works on POSIX systems.
+
+        :param path: The path to the file.
+        """
+
+        if not hasattr(os, "posix_fadvise"):
+            return
+        # The file might have already been moved elsewhere (see `run()`).
+        try:
+            fd = os.open(str(path), os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
     @staticmethod
     def get_random_avatar_position(radius_min: float, radius_max: float, y_min: float, y_max: float,
-                                   center: Dict[str, float], angle_min: float = 0,
-                                   angle_max: float = 360) -> Dict[str, float]:
+                                   center: Dict[str, float], angle_min: float = 0, angle_max: float = 360,
+                                   rng: np.random.Generator = None) -> Dict[str, float]:
         """
         :param radius_min: The minimum distance from the center.
         :param radius_max: The maximum distance from the center.
@@ -160,17 +226,25 @@ class Dataset(Controller, ABC):
         :param center: The centerpoint.
         :param angle_min: The minimum angle of rotation around the centerpoint.
         :param angle_max: The maximum angle of rotation around the centerpoint.
+        :param rng: The random number generator, e.g. a dataset's seeded generator. If None, use the `random` module.
 
         :return: A random position for the avatar around a centerpoint.
         """
 
-        a_r = random.uniform(radius_min, radius_max)
-        a_x = center["x"] + a_r
-        a_z = center["z"] + a_r
-        theta = np.radians(random.uniform(angle_min, angle_max))
-        a_x = np.cos(theta) * (a_x - center["x"]) - np.sin(theta) * (a_z - center["z"]) + center["x"]
-        a_y = random.uniform(y_min, y_max)
-        a_z = np.sin(theta) * (a_x - center["x"]) + np.cos(theta) * (a_z - center["z"]) + center["z"]
+        if rng is None:
+            a_r = random.uniform(radius_min, radius_max)
+            angle = random.uniform(angle_min, angle_max)
+            a_y = random.uniform(y_min, y_max)
+        else:
+            # Sample the radius, angle, and height at once.
+            a_r, angle, a_y = rng.uniform((radius_min, angle_min, y_min), (radius_max, angle_max, y_max)).tolist()
+        theta = math.radians(angle)
+        cos_theta = math.cos(theta)
+        sin_theta = math.sin(theta)
+        # Rotate (a_r, a_r) around the centerpoint. Both coordinates are rotated from the same unrotated offset.
+        # This keeps the original geometry: the avatar is sqrt(2) * a_r from the center.
+        a_x = (cos_theta - sin_theta) * a_r + center["x"]
+        a_z = (sin_theta + cos_theta) * a_r + center["z"]
 
         return {"x": a_x, "y": a_y, "z": a_z}
 
@@ -210,6 +284,20 @@ class Dataset(Controller, ABC):
 
         raise Exception()
 
+    @staticmethod
+    def add_object_id(object_id: int) -> None:
+        """
+        Log the ID of an object that was added to the scene in this trial.
+
+        :param object_id: The ID of the object.
+        """
+
+        if Dataset._NUM_OBJECTS == len(Dataset._OBJECT_IDS_STORE):
+            Dataset._OBJECT_IDS_STORE = np.resize(Dataset._OBJECT_IDS_STORE, 2 * len(Dataset._OBJECT_IDS_STORE))
+        Dataset._OBJECT_IDS_STORE[Dataset._NUM_OBJECTS] = object_id
+        Dataset._NUM_OBJECTS += 1
+        Dataset.OBJECT_IDS = Dataset._OBJECT_IDS_STORE[:Dataset._NUM_OBJECTS]
+
     def _write_static_data(self, static_group: h5py.Group) -> None:
         """
         Write static data to disk after assembling the trial initialization commands.
@@ -217,7 +305,32 @@ class Dataset(Controller, ABC):
         :param static_group: The static data group.
         """
 
-        static_group.create_dataset("object_ids", data=Dataset.OBJECT_IDS)
+        self._create_dataset(static_group, "object_ids", Dataset.OBJECT_IDS)
+
+    def _create_dataset(self, group: h5py.Group, name: str, data, compress: bool = True) -> h5py.Dataset:
+        """
+        Write data to a new dataset. The data is compressed only if it's at least `MIN_COMPRESSION_BYTES` large.
+        Compressed data is chunked along its first axis, with each chunk being about `chunk_bytes` large.
+
+        :param group: The parent group.
+        :param name: The name of the dataset.
+        :param data: The data. Can be a numpy array or anything that can be converted to one.
+        :param compress: If False, never compress the data (e.g. because it's already compressed).
+
+        :return: The new dataset.
+        """
+
+        data = np.asarray(data)
+        # Don't record creation and modification times in each dataset's header; trial data is only written once.
+        if compress and self._compression is not None and data.ndim > 0 and \
+                data.nbytes >= Dataset.MIN_COMPRESSION_BYTES:
+            # The number of rows along the first axis that fit in a chunk.
+            rows = max(1, min(data.shape[0], self._chunk_bytes * data.shape[0] // data.nbytes))
+            # Shuffle the bytes of each element before compression; this improves the ratio of float data.
+            return group.create_dataset(name, data=data, chunks=(rows,) + data.shape[1:],
+                                        compression=self._compression, shuffle=True, track_times=False)
+        else:
+            return group.create_dataset(name, data=data, track_times=False)
 
     @abstractmethod
     def _write_frame(self, frames_grp: h5py.Group, resp: List[bytes], frame_num: int) -> \
@@ -249,7 +362,7 @@ class Dataset(Controller, ABC):
         :param resp: The output data response.
         :param frame: The frame number
 
-        :return: Commands to send per frame.
+        :return: Commands to send per frame. This list is copied before it's sent, so it can be cached and reused.
         """
 
         raise Exception()
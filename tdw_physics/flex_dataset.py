@@ -81,8 +81,11 @@ class FlexDataset(TransformsDataset, ABC):
     A dataset for Flex physics.
     """
 
-    def __init__(self, port: int = 1071):
-        super().__init__(port=port)
+    # Actor static data that is written as int32. Everything else is written as float32.
+    _INT_ACTOR_KEYS = frozenset(["object_id", "mesh_tesselation"])
+
+    def __init__(self, port: int = 1071, **kwargs):
+        super().__init__(port=port, **kwargs)
 
         self._flex_container_command: dict = {}
         self._solid_actors: List[_SolidActor] = []
@@ -108,14 +111,14 @@ class FlexDataset(TransformsDataset, ABC):
                                       ["solid_actors", "soft_actors", "cloth_actors", "fluid_actors"]):
             actor_data = dict()
             for actor in actors:
-                for key in actor.__dict__:
-                    if key not in actor_data:
-                        actor_data.update({key: []})
-                    actor_data[key].append(actor.__dict__[key])
-            # Write the data.
+                for key, value in actor.__dict__.items():
+                    actor_data.setdefault(key, []).append(value)
+            # Write the data with explicit dtypes rather than numpy's 64-bit defaults.
             actors_group = static_group.create_group(group_name)
-            for key in actor_data:
-                actors_group.create_dataset(key, data=actor_data[key])
+            for key, values in actor_data.items():
+                self._create_dataset(actors_group, key,
+                                     np.asarray(values,
+                                                dtype=np.int32 if key in FlexDataset._INT_ACTOR_KEYS else np.float32))
 
     def _write_frame(self, frames_grp: h5py.Group, resp: List[bytes], frame_num: int) -> \
             Tuple[h5py.Group, h5py.Group, dict, bool]:
@@ -133,8 +136,8 @@ class FlexDataset(TransformsDataset, ABC):
                 for o_id in Dataset.OBJECT_IDS:
                     if o_id not in flex_dict:
                         continue
-                    particles_group.create_dataset(str(o_id), data=flex_dict[o_id]["par"])
-                    velocities_group.create_dataset(str(o_id), data=flex_dict[o_id]["vel"])
+                    self._create_dataset(particles_group, str(o_id), flex_dict[o_id]["par"])
+                    self._create_dataset(velocities_group, str(o_id), flex_dict[o_id]["vel"])
         return frame, objs, tr, done
 
     def add_solid_object(self, model_name: str, object_id: int, position: Dict[str, float] = None,
@@ -309,7 +312,7 @@ class FlexDataset(TransformsDataset, ABC):
         # Cache the static data.
         self._fluid_actors.append(_FluidActor(object_id=object_id, mass_scale=mass_scale,
                                               particle_spacing=particle_spacing))
-        Dataset.OBJECT_IDS = np.append(Dataset.OBJECT_IDS, object_id)
+        Dataset.add_object_id(object_id)
         return [{"$type": "load_flex_fluid_from_resources",
                  "id": object_id,
                  "orientation": rotation,
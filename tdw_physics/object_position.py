@@ -6,6 +6,8 @@ class ObjectPosition:
     Defines the initial position of an object.
     """
 
+    __slots__ = ("position", "radius")
+
     def __init__(self, position: Dict[str, float], radius: float):
         """
         :param position: The position of the object.
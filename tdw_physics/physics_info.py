@@ -1,9 +1,8 @@
-import io
-import pkg_resources
 import json
+from pathlib import Path
 from typing import Dict
-from tdw.librarian import ModelRecord, ModelLibrarian
-from tdw.controller import Controller
+from tdw.librarian import ModelRecord
+from tdw_physics.util import get_model_librarian
 
 
 class PhysicsInfo:
@@ -11,6 +10,8 @@ class PhysicsInfo:
     Physics info for an object.
     """
 
+    __slots__ = ("record", "mass", "dynamic_friction", "static_friction", "bounciness")
+
     def __init__(self, record: ModelRecord, mass: float, dynamic_friction: float, static_friction: float,
                  bounciness: float):
         """
@@ -35,14 +36,11 @@ def __get_default_physics_info() -> Dict[str, PhysicsInfo]:
 
     info: Dict[str, PhysicsInfo] = {}
 
-    with io.open(pkg_resources.resource_filename(__name__, "data/physics_info.json"), "rt", encoding="utf-8") as f:
+    with Path(__file__).resolve().parent.joinpath("data/physics_info.json").open("rt", encoding="utf-8") as f:
         _data = json.load(f)
         for key in _data:
             obj = _data[key]
-            # Cache the library.
-            if obj["library"] not in Controller.MODEL_LIBRARIANS:
-                Controller.MODEL_LIBRARIANS[obj["library"]] = ModelLibrarian(obj["library"])
-            info[key] = PhysicsInfo(record=Controller.MODEL_LIBRARIANS[obj["library"]].get_record(obj["name"]),
+            info[key] = PhysicsInfo(record=get_model_librarian(obj["library"]).get_record(obj["name"]),
                                     mass=obj["mass"],
                                     bounciness=obj["bounciness"],
                                     dynamic_friction=obj["dynamic_friction"],
@@ -17,11 +17,11 @@ class RigidbodiesDataset(TransformsDataset, ABC):
     A dataset for Rigidbody (PhysX) physics.
     """
 
-    # Static physics data.
-    MASSES: np.array = np.empty(dtype=np.float32, shape=0)
-    STATIC_FRICTIONS: np.array = np.empty(dtype=np.float32, shape=0)
-    DYNAMIC_FRICTIONS: np.array = np.empty(dtype=np.float32, shape=0)
-    BOUNCINESSES: np.array = np.empty(dtype=np.float32, shape=0)
+    # Static physics data. These are converted to arrays when they're written to disk.
+    MASSES: List[float] = []
+    STATIC_FRICTIONS: List[float] = []
+    DYNAMIC_FRICTIONS: List[float] = []
+    BOUNCINESSES: List[float] = []
     # The physics info of each object instance. Useful for referencing in a controller, but not written to disk.
     PHYSICS_INFO: Dict[int, PhysicsInfo] = dict()
 
@@ -55,10 +55,11 @@ class RigidbodiesDataset(TransformsDataset, ABC):
         # Use override physics values.
         if not default_physics_values and model_name in PHYSICS_INFO:
             default_physics_values = False
-            mass = PHYSICS_INFO[model_name].mass
-            dynamic_friction = PHYSICS_INFO[model_name].dynamic_friction
-            static_friction = PHYSICS_INFO[model_name].static_friction
-            bounciness = PHYSICS_INFO[model_name].bounciness
+            info = PHYSICS_INFO[model_name]
+            mass = info.mass
+            dynamic_friction = info.dynamic_friction
+            static_friction = info.static_friction
+            bounciness = info.bounciness
         commands = TransformsDataset.get_add_physics_object(model_name=model_name,
                                                             object_id=object_id,
                                                             position=position,
@@ -74,7 +75,7 @@ class RigidbodiesDataset(TransformsDataset, ABC):
                                                             bounciness=bounciness,
                                                             scale_mass=scale_mass)
         # Log the object ID.
-        Dataset.OBJECT_IDS = np.append(Dataset.OBJECT_IDS, object_id)
+        Dataset.add_object_id(object_id)
         # Get the static data from the commands (these values might be automatically set).
         mass = 0
         dynamic_friction = 0
@@ -88,10 +89,10 @@ class RigidbodiesDataset(TransformsDataset, ABC):
                 static_friction = command["static_friction"]
                 bounciness = command["bounciness"]
         # Cache the static data.
-        RigidbodiesDataset.MASSES = np.append(RigidbodiesDataset.MASSES, mass)
-        RigidbodiesDataset.DYNAMIC_FRICTIONS = np.append(RigidbodiesDataset.DYNAMIC_FRICTIONS, dynamic_friction)
-        RigidbodiesDataset.STATIC_FRICTIONS = np.append(RigidbodiesDataset.STATIC_FRICTIONS, static_friction)
-        RigidbodiesDataset.BOUNCINESSES = np.append(RigidbodiesDataset.BOUNCINESSES, bounciness)
+        RigidbodiesDataset.MASSES.append(mass)
+        RigidbodiesDataset.DYNAMIC_FRICTIONS.append(dynamic_friction)
+        RigidbodiesDataset.STATIC_FRICTIONS.append(static_friction)
+        RigidbodiesDataset.BOUNCINESSES.append(bounciness)
         # Cache the physics info.
         record = Controller.MODEL_LIBRARIANS[library].get_record(model_name)
         RigidbodiesDataset.PHYSICS_INFO[object_id] = PhysicsInfo(record=record,
@@ -103,10 +104,11 @@ class RigidbodiesDataset(TransformsDataset, ABC):
 
     def trial(self, filepath: Path, temp_path: Path, trial_num: int) -> None:
         # Clear data.
-        RigidbodiesDataset.MASSES = np.empty(dtype=int, shape=0)
-        RigidbodiesDataset.DYNAMIC_FRICTIONS = np.empty(dtype=int, shape=0)
-        RigidbodiesDataset.STATIC_FRICTIONS = np.empty(dtype=int, shape=0)
-        RigidbodiesDataset.BOUNCINESSES = np.empty(dtype=int, shape=0)
+        RigidbodiesDataset.MASSES.clear()
+        RigidbodiesDataset.DYNAMIC_FRICTIONS.clear()
+        RigidbodiesDataset.STATIC_FRICTIONS.clear()
+        RigidbodiesDataset.BOUNCINESSES.clear()
+        RigidbodiesDataset.PHYSICS_INFO.clear()
         super().trial(filepath=filepath, temp_path=temp_path, trial_num=trial_num)
 
     @staticmethod
@@ -117,7 +119,7 @@ class RigidbodiesDataset(TransformsDataset, ABC):
         :return: A list of object IDs for objects with mass <= the mass threshold.
         """
 
-        return [o for o in RigidbodiesDataset.PHYSICS_INFO.keys() if RigidbodiesDataset.PHYSICS_INFO[o].mass < mass]
+        return [o_id for o_id, info in RigidbodiesDataset.PHYSICS_INFO.items() if info.mass < mass]
 
     def get_falling_commands(self, mass: float = 3) -> List[List[dict]]:
         """
@@ -130,19 +132,16 @@ class RigidbodiesDataset(TransformsDataset, ABC):
 
         # Get a list of all small objects.
         small_ids = self.get_objects_by_mass(mass)
-        random.shuffle(small_ids)
         max_num_objects = len(small_ids) if len(small_ids) < 8 else 8
         min_num_objects = max_num_objects - 3
         if min_num_objects <= 0:
             min_num_objects = 1
         # Add some objects.
-        for i in range(random.randint(min_num_objects, max_num_objects)):
-            o_id = small_ids.pop(0)
+        for o_id in random.sample(small_ids, random.randint(min_num_objects, max_num_objects)):
             force_dir = np.array([random.uniform(-0.125, 0.125), random.uniform(0.7, 1), random.uniform(-0.125, 0.125)])
             force_dir = force_dir / np.linalg.norm(force_dir)
-            min_force = RigidbodiesDataset.PHYSICS_INFO[o_id].mass * 2
-            max_force = RigidbodiesDataset.PHYSICS_INFO[o_id].mass * 4
-            force = TDWUtils.array_to_vector3(force_dir * random.uniform(min_force, max_force))
+            o_mass = RigidbodiesDataset.PHYSICS_INFO[o_id].mass
+            force = TDWUtils.array_to_vector3(force_dir * random.uniform(o_mass * 2, o_mass * 4))
             per_frame_commands.append([{"$type": "apply_force_to_object",
                                         "force": force,
                                         "id": o_id}])
@@ -165,10 +164,12 @@ class RigidbodiesDataset(TransformsDataset, ABC):
     def _write_static_data(self, static_group: h5py.Group) -> None:
         super()._write_static_data(static_group)
 
-        static_group.create_dataset("mass", data=RigidbodiesDataset.MASSES)
-        static_group.create_dataset("static_friction", data=RigidbodiesDataset.STATIC_FRICTIONS)
-        static_group.create_dataset("dynamic_friction", data=RigidbodiesDataset.DYNAMIC_FRICTIONS)
-        static_group.create_dataset("bounciness", data=RigidbodiesDataset.BOUNCINESSES)
+        self._create_dataset(static_group, "mass", np.asarray(RigidbodiesDataset.MASSES, dtype=np.float32))
+        self._create_dataset(static_group, "static_friction",
+                             np.asarray(RigidbodiesDataset.STATIC_FRICTIONS, dtype=np.float32))
+        self._create_dataset(static_group, "dynamic_friction",
+                             np.asarray(RigidbodiesDataset.DYNAMIC_FRICTIONS, dtype=np.float32))
+        self._create_dataset(static_group, "bounciness", np.asarray(RigidbodiesDataset.BOUNCINESSES, dtype=np.float32))
 
     def _write_frame(self, frames_grp: h5py.Group, resp: List[bytes], frame_num: int) -> \
             Tuple[h5py.Group, h5py.Group, dict, bool]:
@@ -177,13 +178,13 @@ class RigidbodiesDataset(TransformsDataset, ABC):
         # Physics data.
         velocities = np.empty(dtype=np.float32, shape=(num_objects, 3))
         angular_velocities = np.empty(dtype=np.float32, shape=(num_objects, 3))
-        # Collision data.
-        collision_ids = np.empty(dtype=np.int32, shape=(0, 2))
-        collision_relative_velocities = np.empty(dtype=np.float32, shape=(0, 3))
-        collision_contacts = np.empty(dtype=np.float32, shape=(0, 2, 3))
+        # Collision data. These are converted to arrays after all of the output data has been parsed.
+        collision_ids: List[List[int]] = []
+        collision_relative_velocities: List[np.array] = []
+        collision_contacts: List[List[np.array]] = []
         # Environment Collision data.
-        env_collision_ids = np.empty(dtype=np.int32, shape=(0, 1))
-        env_collision_contacts = np.empty(dtype=np.float32, shape=(0, 2, 3))
+        env_collision_ids: List[int] = []
+        env_collision_contacts: List[List[np.array]] = []
 
         sleeping = True
 
@@ -193,37 +194,37 @@ class RigidbodiesDataset(TransformsDataset, ABC):
                 ri = Rigidbodies(r)
                 ri_dict = dict()
                 for i in range(ri.get_num()):
-                    ri_dict.update({ri.get_id(i): {"vel": ri.get_velocity(i),
-                                                   "ang": ri.get_angular_velocity(i)}})
+                    o_id = ri.get_id(i)
+                    ri_dict[o_id] = {"vel": ri.get_velocity(i),
+                                     "ang": ri.get_angular_velocity(i)}
                     # Check if any objects are sleeping that aren't in the abyss.
-                    if not ri.get_sleeping(i) and tr[ri.get_id(i)]["pos"][1] >= -1:
+                    if sleeping and not ri.get_sleeping(i) and tr[o_id]["pos"][1] >= -1:
                         sleeping = False
                 # Add the Rigibodies data.
-                for o_id, i in zip(Dataset.OBJECT_IDS, range(num_objects)):
+                for i, o_id in enumerate(Dataset.OBJECT_IDS.tolist()):
                     velocities[i] = ri_dict[o_id]["vel"]
                     angular_velocities[i] = ri_dict[o_id]["ang"]
             elif r_id == "coll":
                 co = Collision(r)
-                collision_ids = np.append(collision_ids, [co.get_collider_id(), co.get_collidee_id()])
-                collision_relative_velocities = np.append(collision_relative_velocities, co.get_relative_velocity())
+                collision_ids.append([co.get_collider_id(), co.get_collidee_id()])
+                collision_relative_velocities.append(co.get_relative_velocity())
                 for i in range(co.get_num_contacts()):
-                    collision_contacts = np.append(collision_contacts, np.array([co.get_contact_normal(i),
-                                                                                 co.get_contact_point(i)]))
+                    collision_contacts.append([co.get_contact_normal(i), co.get_contact_point(i)])
             elif r_id == "enco":
                 en = EnvironmentCollision(r)
-                env_collision_ids = np.append(env_collision_ids, en.get_object_id())
+                env_collision_ids.append(en.get_object_id())
                 for i in range(en.get_num_contacts()):
-                    env_collision_contacts = np.append(env_collision_contacts, np.array([en.get_contact_normal(i),
-                                                                                         en.get_contact_point(i)]))
-        objs.create_dataset("velocities", data=velocities.reshape(num_objects, 3), compression="gzip")
-        objs.create_dataset("angular_velocities", data=angular_velocities.reshape(num_objects, 3), compression="gzip")
+                    env_collision_contacts.append([en.get_contact_normal(i), en.get_contact_point(i)])
+        self._create_dataset(objs, "velocities", velocities.reshape(num_objects, 3))
+        self._create_dataset(objs, "angular_velocities", angular_velocities.reshape(num_objects, 3))
         collisions = frame.create_group("collisions")
-        collisions.create_dataset("object_ids", data=collision_ids.reshape((-1, 2)), compression="gzip")
-        collisions.create_dataset("relative_velocities", data=collision_relative_velocities.reshape((-1, 3)),
-                                  compression="gzip")
-        collisions.create_dataset("contacts", data=collision_contacts.reshape((-1, 2, 3)), compression="gzip")
+        self._create_dataset(collisions, "object_ids", np.array(collision_ids, dtype=np.int32).reshape((-1, 2)))
+        self._create_dataset(collisions, "relative_velocities",
+                             np.array(collision_relative_velocities, dtype=np.float32).reshape((-1, 3)))
+        self._create_dataset(collisions, "contacts",
+                             np.array(collision_contacts, dtype=np.float32).reshape((-1, 2, 3)))
         env_collisions = frame.create_group("env_collisions")
-        env_collisions.create_dataset("object_ids", data=env_collision_ids, compression="gzip")
-        env_collisions.create_dataset("contacts", data=env_collision_contacts.reshape((-1, 2, 3)),
-                                      compression="gzip")
+        self._create_dataset(env_collisions, "object_ids", np.array(env_collision_ids, dtype=np.int32))
+        self._create_dataset(env_collisions, "contacts",
+                             np.array(env_collision_contacts, dtype=np.float32).reshape((-1, 2, 3)))
         return frame, objs, tr, sleeping
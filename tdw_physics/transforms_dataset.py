@@ -29,7 +29,7 @@ class TransformsDataset(Dataset, ABC):
         """
 
         # Log the static data.
-        Dataset.OBJECT_IDS = np.append(Dataset.OBJECT_IDS, object_id)
+        Dataset.add_object_id(object_id)
 
         return Dataset.get_add_object(model_name=model_name, object_id=object_id, position=position, rotation=rotation,
                                       library=library)
@@ -64,12 +64,11 @@ class TransformsDataset(Dataset, ABC):
             if r_id == "tran":
                 tr = Transforms(r)
                 for i in range(tr.get_num()):
-                    pos = tr.get_position(i)
-                    tr_dict.update({tr.get_id(i): {"pos": pos,
-                                                   "for": tr.get_forward(i),
-                                                   "rot": tr.get_rotation(i)}})
+                    tr_dict[tr.get_id(i)] = {"pos": tr.get_position(i),
+                                             "for": tr.get_forward(i),
+                                             "rot": tr.get_rotation(i)}
                 # Add the Transforms data.
-                for o_id, i in zip(Dataset.OBJECT_IDS, range(num_objects)):
+                for i, o_id in enumerate(Dataset.OBJECT_IDS.tolist()):
                     if o_id not in tr_dict:
                         continue
                     positions[i] = tr_dict[o_id]["pos"]
@@ -82,19 +81,19 @@ class TransformsDataset(Dataset, ABC):
                     pass_mask = im.get_pass_mask(i)
                     # Reshape the depth pass array.
                     if pass_mask == "_depth":
-                        image_data = TDWUtils.get_shaped_depth_pass(images=im, index=i)
+                        self._create_dataset(images, pass_mask, TDWUtils.get_shaped_depth_pass(images=im, index=i))
+                    # The other passes are already encoded as .png or .jpg files; compressing them again wastes time.
                     else:
-                        image_data = im.get_image(i)
-                    images.create_dataset(pass_mask, data=image_data, compression="gzip")
+                        self._create_dataset(images, pass_mask, im.get_image(i), compress=False)
             # Add the camera matrices.
-            elif OutputData.get_data_type_id(r) == "cama":
+            elif r_id == "cama":
                 matrices = CameraMatrices(r)
-                camera_matrices.create_dataset("projection_matrix", data=matrices.get_projection_matrix())
-                camera_matrices.create_dataset("camera_matrix", data=matrices.get_camera_matrix())
+                self._create_dataset(camera_matrices, "projection_matrix", matrices.get_projection_matrix())
+                self._create_dataset(camera_matrices, "camera_matrix", matrices.get_camera_matrix())
 
         objs = frame.create_group("objects")
-        objs.create_dataset("positions", data=positions.reshape(num_objects, 3), compression="gzip")
-        objs.create_dataset("forwards", data=forwards.reshape(num_objects, 3), compression="gzip")
-        objs.create_dataset("rotations", data=rotations.reshape(num_objects, 4), compression="gzip")
+        self._create_dataset(objs, "positions", positions.reshape(num_objects, 3))
+        self._create_dataset(objs, "forwards", forwards.reshape(num_objects, 3))
+        self._create_dataset(objs, "rotations", rotations.reshape(num_objects, 4))
 
         return frame, objs, tr_dict, False
@@ -1,6 +1,10 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple, Any
+from functools import lru_cache
+from argparse import ArgumentParser, Namespace
 import random
 from tdw.tdw_utils import TDWUtils
+from tdw.controller import Controller
+from tdw.librarian import ModelLibrarian
 
 
 def get_move_along_direction(pos: Dict[str, float], target: Dict[str, float], d: float, noise: float = 0) -> \
@@ -42,18 +46,79 @@ def get_object_look_at(o_id: int, pos: Dict[str, float], noise: float = 0) -> Li
     return commands
 
 
-def get_args(dataset_dir: str):
+def get_random_color_command(o_id: int) -> dict:
+    """
+    :param o_id: The ID of the object.
+
+    :return: A command to set the object to a random opaque color.
+    """
+
+    return {"$type": "set_color",
+            "color": {"r": random.random(), "g": random.random(), "b": random.random(), "a": 1.0},
+            "id": o_id}
+
+
+def get_model_librarian(library: str) -> ModelLibrarian:
+    """
+    Parsing a records file is slow, so each library is loaded once and shared via `Controller.MODEL_LIBRARIANS` (which is also where TDW caches the libraries it loads).
+
+    :param library: The name or path of the records file.
+
+    :return: The model librarian.
+    """
+
+    if library not in Controller.MODEL_LIBRARIANS:
+        Controller.MODEL_LIBRARIANS[library] = ModelLibrarian(library)
+    return Controller.MODEL_LIBRARIANS[library]
+
+
+@lru_cache(maxsize=None)
+def _get_parser(dataset_dir: str, num: int, scenarios: Tuple[str, ...]) -> ArgumentParser:
     """
     :param dataset_dir: The default name of the dataset.
+    :param num: The default number of trials in the dataset.
+    :param scenarios: The choices of the `--scenario` argument. If empty, there is no `--scenario` argument.
 
-    :return: Parsed command-line arguments common to all controllers.
+    :return: A parser of command-line arguments common to all controllers. Each parser is only built once.
     """
 
-    from argparse import ArgumentParser
     parser = ArgumentParser()
     parser.add_argument("--dir", type=str, default=f"D:/{dataset_dir}", help="Root output directory.")
-    parser.add_argument("--num", type=int, default=3000, help="The number of trials in the dataset.")
+    parser.add_argument("--num", type=int, default=num, help="The number of trials in the dataset.")
     parser.add_argument("--temp", type=str, default="D:/temp.hdf5", help="Temp path for incomplete files.")
     parser.add_argument("--width", type=int, default=256, help="Screen width in pixels.")
     parser.add_argument("--height", type=int, default=256, help="Screen width in pixels.")
-    return parser.parse_args()
+    parser.add_argument("--compression", type=str, choices=["gzip", "lzf", "none"], default="gzip",
+                        help="The HDF5 compression filter of large datasets.")
+    parser.add_argument("--chunk_bytes", type=int, default=1024 ** 2,
+                        help="The target size in bytes of each chunk of a compressed dataset.")
+    parser.add_argument("--in_memory", action="store_true",
+                        help="Build each trial file in memory and write it to disk when the trial ends.")
+    if len(scenarios) > 0:
+        parser.add_argument("--scenario", type=str, choices=scenarios, default=scenarios[0],
+                            help="The type of scenario")
+    return parser
+
+
+def get_args(dataset_dir: str, num: int = 3000, scenarios: List[str] = None):
+    """
+    :param dataset_dir: The default name of the dataset.
+    :param num: The default number of trials in the dataset.
+    :param scenarios: If not None, add a `--scenario` argument with these choices. The first scenario is the default.
+
+    :return: Parsed command-line arguments common to all controllers.
+    """
+
+    return _get_parser(dataset_dir, num, tuple(scenarios) if scenarios is not None else ()).parse_args()
+
+
+def get_dataset_kwargs(args: Namespace) -> Dict[str, Any]:
+    """
+    :param args: Command-line arguments returned by `get_args()`.
+
+    :return: Keyword arguments for a dataset's constructor: `compression`, `chunk_bytes`, and `in_memory`.
+    """
+
+    return {"compression": None if args.compression == "none" else args.compression,
+            "chunk_bytes": args.chunk_bytes,
+            "in_memory": args.in_memory}